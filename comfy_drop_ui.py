@@ -1,12 +1,18 @@
+import io
 import json
+import mmap
 import os
+import re
+import struct
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from PIL import Image, ImageTk
-import pyperclip
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
+import queue
 import threading
-import glob
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Try to import tkinterdnd2 for drag and drop
 try:
@@ -15,19 +21,168 @@ try:
 except ImportError:
     HAS_DND = False
 
+# Use orjson for the (often large) workflow JSON when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+_CHUNK_HEADER = struct.Struct('>I4s')
+
+# PNG IHDR color type -> PIL mode name
+PNG_COLOR_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+# Lookup constants used in the per-node extraction loops
+CLIP_TEXT_ENCODE = 'CLIPTextEncode'
+SR_NODE_NAME = 'Node name for S&R'
+EMPTY_DICT = MappingProxyType({})  # Shared read-only default for missing sub-dicts
+
+# Number of (path, mtime, size) extraction results kept for re-dropped files
+RESULT_CACHE_SIZE = 2048
+
+def _read_png_text_chunks(file_path: str):
+    """Return the IHDR size/mode and the text chunks that precede the image data"""
+    header = {'size': None, 'mode': None}
+    text_chunks = {}
+    
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("File is not a PNG")
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 8
+            end = len(mm)
+            while offset + 8 <= end:
+                length, ctype = _CHUNK_HEADER.unpack_from(mm, offset)
+                data_start = offset + 8
+                offset = data_start + length + 4  # Skip data + CRC
+                
+                if ctype in (b'IDAT', b'IEND'):
+                    break
+                
+                if ctype not in (b'IHDR', b'tEXt', b'zTXt', b'iTXt'):
+                    continue
+                
+                if data_start + length > end:
+                    break  # Truncated file
+                data = mm[data_start:data_start + length]
+                
+                try:
+                    if ctype == b'IHDR':
+                        width = int.from_bytes(data[0:4], 'big')
+                        height = int.from_bytes(data[4:8], 'big')
+                        header['size'] = (width, height)
+                        header['mode'] = PNG_COLOR_MODES.get(data[9], 'Unknown')
+                    elif ctype == b'tEXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        text_chunks[keyword.decode('latin-1')] = value.decode('latin-1')
+                    elif ctype == b'zTXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        # value[0] is the compression method (always zlib)
+                        text_chunks[keyword.decode('latin-1')] = zlib.decompress(value[1:]).decode('latin-1')
+                    else:
+                        keyword, _, rest = data.partition(b'\x00')
+                        compressed = rest[0]
+                        # Skip compression method, then language tag and translated keyword
+                        _language, _, rest = rest[2:].partition(b'\x00')
+                        _translated, _, value = rest.partition(b'\x00')
+                        if compressed:
+                            value = zlib.decompress(value)
+                        text_chunks[keyword.decode('latin-1')] = value.decode('utf-8')
+                except (IndexError, zlib.error, UnicodeDecodeError) as e:
+                    print(f"Warning: Skipping malformed {ctype.decode('latin-1')} chunk: {e}")
+    
+    return header, text_chunks
+
+def _is_png(file_path: str) -> bool:
+    """Check the 8-byte PNG signature, so misnamed or non-image files are rejected cheaply"""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(8) == PNG_SIGNATURE
+    except OSError:
+        return False
+
+def _iter_png_files(root: str):
+    """
+    Recursively yield the paths of PNG files below a directory
+    
+    Uses os.scandir so file/directory checks come from the cached directory
+    entries instead of an extra stat per file. Hidden entries are skipped,
+    matching the previous glob("**/*.png") behavior.
+    """
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file() and entry.name.lower().endswith('.png'):
+                        yield entry.path
+        except OSError:
+            continue
+
 class ComfyUIPromptExtractorUI:
+    # Case-insensitive prompt classifiers, so no lowercased copies are needed
+    _POS_RE = re.compile(r'pos(itive)?', re.I)
+    _NEG_RE = re.compile(r'neg(ative)?', re.I)
+    _NEGATIVE_WORD_RE = re.compile(r'negative', re.I)
+    _NEGATIVE_PREFIX_RE = re.compile(r'\s*negative', re.I)
+    
+    # Fast path over the raw prompt JSON: '"<id>": {"inputs": {"text": "<str>", ...}, "class_type": "CLIPTextEncode"'
+    _JSON_STR = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
+    _PROMPT_NODE_RE = re.compile(
+        _JSON_STR + r'\s*:\s*\{\s*"inputs"\s*:\s*\{\s*"text"\s*:\s*' + _JSON_STR +
+        r'[^{}]*\}\s*,\s*"class_type"\s*:\s*"CLIPTextEncode"\s*[,}]'
+    )
+    _CLIP_CLASS_RE = re.compile(r'"class_type"\s*:\s*"CLIPTextEncode"')
+    
     def __init__(self, root):
         self.root = root
         self.root.title("ComfyUI Positive Prompt Extractor")
         self.root.geometry("900x700")
         self.root.configure(bg='#f0f0f0')
         
+        # LRU of extraction results keyed by (path, mtime_ns, size), so re-dropped files
+        # aren't re-parsed; shared by the worker threads, hence the lock
+        self._extract_cache = OrderedDict()
+        self._extract_cache_lock = threading.Lock()
+        
+        # Persistent worker pool; finished futures are handed to the UI thread through a queue
+        max_workers = min(32, (os.cpu_count() or 4) * 4)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='extract')
+        self._result_q = queue.Queue()
+        self._batch_id = 0
+        self._batch_files = []
+        self._batch_results = []
+        self._batch_futures = []
+        self._batch_done = 0
+        self._polling = False
+        self._skipped_files = 0
+        
         # Configure style
         style = ttk.Style()
         style.theme_use('clam')
         
         self.setup_ui()
         
+        # Drop queued jobs when the window closes. This has to happen here rather
+        # than in an atexit hook: concurrent.futures joins its workers first
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def on_close(self):
+        """Cancel pending extraction jobs and close the window"""
+        for pending in self._batch_futures:
+            pending.cancel()
+        self._batch_futures = []
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+        
     def setup_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -159,7 +314,7 @@ class ComfyUIPromptExtractorUI:
         self.clear_btn.grid(row=0, column=3)
         
         # Progress bar (hidden by default)
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        self.progress = ttk.Progressbar(main_frame, mode='determinate', maximum=100)
         self.progress.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 5))
         self.progress.grid_remove()  # Hide initially
         
@@ -203,7 +358,7 @@ class ComfyUIPromptExtractorUI:
         
         if folder_path:
             # Find all PNG files in the folder
-            png_files = glob.glob(os.path.join(folder_path, "**", "*.png"), recursive=True)
+            png_files = list(_iter_png_files(folder_path))
             if png_files:
                 self.load_files(png_files)
             else:
@@ -212,16 +367,21 @@ class ComfyUIPromptExtractorUI:
     def load_files(self, file_paths):
         """Load and process the selected files"""
         # Filter for PNG files and existing files
-        valid_files = []
+        candidates = []
         for file_path in file_paths:
             if os.path.isdir(file_path):
                 # If it's a directory, find PNG files in it
-                png_files = glob.glob(os.path.join(file_path, "**", "*.png"), recursive=True)
-                valid_files.extend(png_files)
+                candidates.extend(_iter_png_files(file_path))
             elif os.path.exists(file_path) and file_path.lower().endswith('.png'):
-                valid_files.append(file_path)
+                candidates.append(file_path)
+        
+        # Drop files that only look like PNGs by name
+        valid_files = [file_path for file_path in candidates if _is_png(file_path)]
+        self._skipped_files = len(candidates) - len(valid_files)
         
         if not valid_files:
+            if self._skipped_files:
+                self.status_var.set(f"✗ Skipped {self._skipped_files} files that are not valid PNGs")
             messagebox.showwarning("Warning", "No valid PNG files found")
             return
         
@@ -231,9 +391,12 @@ class ComfyUIPromptExtractorUI:
         else:
             self.file_path_var.set(f"{len(valid_files)} PNG files selected")
         
-        self.status_var.set("Processing...")
+        if self._skipped_files:
+            self.status_var.set(f"Processing... (skipped {self._skipped_files} files that are not valid PNGs)")
+        else:
+            self.status_var.set("Processing...")
+        self.progress['value'] = 0
         self.progress.grid()
-        self.progress.start()
         
         # Disable buttons during processing
         self.browse_file_btn.configure(state='disabled')
@@ -242,64 +405,122 @@ class ComfyUIPromptExtractorUI:
         self.copy_first_btn.configure(state='disabled')
         self.save_btn.configure(state='disabled')
         
-        # Process files in separate thread to avoid UI freezing
-        thread = threading.Thread(target=self.extract_prompts_thread, args=(valid_files,))
-        thread.daemon = True
-        thread.start()
+        # Process files on the worker pool to avoid UI freezing
+        self.start_extraction(valid_files)
     
-    def extract_prompts_thread(self, file_paths):
-        """Extract prompts in separate thread"""
-        try:
-            results = []
-            for file_path in file_paths:
-                result = self.extract_positive_prompts_only(file_path)
-                results.append(result)
+    def start_extraction(self, file_paths):
+        """Submit one extraction job per file and start polling for results"""
+        # Supersede any batch that is still running
+        for future in self._batch_futures:
+            future.cancel()
+        
+        self._batch_id += 1
+        batch_id = self._batch_id
+        self._batch_files = list(file_paths)
+        self._batch_results = [None] * len(file_paths)
+        self._batch_done = 0
+        self._batch_futures = []
+        
+        for index, file_path in enumerate(self._batch_files):
+            future = self._executor.submit(self.extract_positive_prompts_cached, file_path)
+            future.add_done_callback(lambda f, i=index: self._result_q.put((batch_id, i, f)))
+            self._batch_futures.append(future)
+        
+        if not self._polling:
+            self._polling = True
+            self.root.after(50, self._poll_q)
+    
+    def _poll_q(self, max_items=200):
+        """Drain finished jobs on the UI thread and update progress"""
+        for _ in range(max_items):
+            try:
+                batch_id, index, future = self._result_q.get_nowait()
+            except queue.Empty:
+                break
             
-            # Update UI in main thread
-            self.root.after(0, self.update_results, results, file_paths)
-        except Exception as e:
-            self.root.after(0, self.show_error, str(e))
+            # Results from a superseded batch are dropped
+            if batch_id != self._batch_id or future.cancelled():
+                continue
+            
+            error = future.exception()
+            if error is not None:
+                for pending in self._batch_futures:
+                    pending.cancel()
+                self._batch_futures = []
+                self._polling = False
+                self.show_error(str(error))
+                return
+            
+            self._batch_results[index] = future.result()
+            self._batch_done += 1
+        
+        total = len(self._batch_files)
+        if self._batch_done == total:
+            self._batch_futures = []
+            self._polling = False
+            self.update_results(self._batch_results, self._batch_files)
+            return
+        
+        self.progress['value'] = 100 * self._batch_done / total
+        self.status_var.set(f"Processing... {self._batch_done}/{total}")
+        self.root.after(50, self._poll_q)
+    
+    def extract_positive_prompts_cached(self, file_path: str) -> Dict[str, Any]:
+        """Return cached extraction results unless the file changed since it was last read"""
+        st = os.stat(file_path)
+        key = (file_path, st.st_mtime_ns, st.st_size)
+        
+        with self._extract_cache_lock:
+            result = self._extract_cache.get(key)
+            if result is not None:
+                self._extract_cache.move_to_end(key)
+                return result
+        
+        result = self.extract_positive_prompts_only(file_path)
+        with self._extract_cache_lock:
+            self._extract_cache[key] = result
+            if len(self._extract_cache) > RESULT_CACHE_SIZE:
+                self._extract_cache.popitem(last=False)
+        return result
     
     def extract_positive_prompts_only(self, file_path: str) -> Dict[str, Any]:
         """Extract only positive prompts from ComfyUI PNG metadata"""
         try:
-            with Image.open(file_path) as img:
-                if img.format != 'PNG':
-                    raise ValueError(f"File is not a PNG: {img.format}")
-                
-                metadata = img.info
-                result = {
-                    'file_info': {
-                        'filename': os.path.basename(file_path),
-                        'size': img.size,
-                        'mode': img.mode
-                    },
-                    'positive_prompts': []
-                }
-                
-                # Track processed node IDs to avoid duplicates
-                processed_nodes = set()
-                
-                # Try workflow first (usually more detailed)
-                if 'workflow' in metadata:
-                    try:
-                        workflow_data = json.loads(metadata['workflow'])
-                        prompts = self.extract_positive_from_workflow(workflow_data, processed_nodes)
-                        result['positive_prompts'].extend(prompts)
-                    except json.JSONDecodeError as e:
-                        print(f"Warning: Could not parse workflow JSON: {e}")
-                
-                # Only check prompt data if we didn't find anything in workflow
-                if not result['positive_prompts'] and 'prompt' in metadata:
-                    try:
-                        prompt_data = json.loads(metadata['prompt'])
+            header, metadata = _read_png_text_chunks(file_path)
+            result = {
+                'file_info': {
+                    'filename': os.path.basename(file_path),
+                    'size': header['size'],
+                    'mode': header['mode']
+                },
+                'positive_prompts': []
+            }
+            
+            # Track processed node IDs to avoid duplicates
+            processed_nodes = set()
+            
+            # Try workflow first (usually more detailed)
+            if 'workflow' in metadata:
+                try:
+                    workflow_data = _loads(metadata['workflow'])
+                    prompts = self.extract_positive_from_workflow(workflow_data, processed_nodes)
+                    result['positive_prompts'].extend(prompts)
+                except json.JSONDecodeError as e:
+                    print(f"Warning: Could not parse workflow JSON: {e}")
+            
+            # Only check prompt data if we didn't find anything in workflow
+            if not result['positive_prompts'] and 'prompt' in metadata:
+                try:
+                    prompts = self.extract_positive_from_prompt_json(metadata['prompt'], processed_nodes)
+                    if prompts is None:
+                        prompt_data = _loads(metadata['prompt'])
                         prompts = self.extract_positive_from_prompt_data(prompt_data, processed_nodes)
-                        result['positive_prompts'].extend(prompts)
-                    except json.JSONDecodeError as e:
-                        print(f"Warning: Could not parse prompt JSON: {e}")
-                
-                return result
-                
+                    result['positive_prompts'].extend(prompts)
+                except json.JSONDecodeError as e:
+                    print(f"Warning: Could not parse prompt JSON: {e}")
+            
+            return result
+            
         except Exception as e:
             raise Exception(f"Error reading PNG file: {e}")
     
@@ -311,37 +532,36 @@ class ComfyUIPromptExtractorUI:
         
         for node in nodes:
             node_id = node.get('id')
-            node_type = node.get('type', '')
-            title = node.get('title', '').lower()
+            node_type = node.get('type') or ''
+            title = node.get('title', '')
             
             # Skip if already processed
             if node_id in processed_nodes:
                 continue
             
-            # Look for CLIPTextEncode nodes
-            if (node_type == 'CLIPTextEncode' or 
-                'cliptext' in node_type.lower() or 
-                node.get('properties', {}).get('Node name for S&R') == 'CLIPTextEncode'):
+            # Look for CLIPTextEncode nodes (the substring test also covers an exact match)
+            if ('cliptext' in node_type.lower() or 
+                node.get('properties', EMPTY_DICT).get(SR_NODE_NAME) == CLIP_TEXT_ENCODE):
                 
                 widgets_values = node.get('widgets_values', [])
                 
                 if widgets_values and len(widgets_values) > 0:
                     prompt_text = widgets_values[0]
                     
+                    has_text = prompt_text.strip() != ''
+                    untitled = title == '' or title.lower() == 'untitled'
+                    
                     # Only include if it's likely a positive prompt
                     is_positive = (
-                        'positive' in title or 
-                        'pos' in title or
-                        (title == '' and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50]) or
-                        (title == 'untitled' and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50])
+                        self._POS_RE.search(title) is not None or
+                        (untitled and has_text and self._NEGATIVE_WORD_RE.search(prompt_text, 0, 50) is None)
                     )
                     
                     # Exclude obvious negative prompts
                     is_negative = (
-                        'negative' in title or 
-                        'neg' in title or
-                        prompt_text.strip() == '' or
-                        prompt_text.lower().strip().startswith('negative')
+                        self._NEG_RE.search(title) is not None or
+                        not has_text or
+                        self._NEGATIVE_PREFIX_RE.match(prompt_text) is not None
                     )
                     
                     if is_positive and not is_negative:
@@ -358,6 +578,39 @@ class ComfyUIPromptExtractorUI:
         
         return positive_prompts
     
+    def extract_positive_from_prompt_json(self, prompt_json: str, processed_nodes: set) -> Optional[List[Dict]]:
+        """
+        Extract positive prompts by scanning the raw prompt JSON, without parsing it
+        
+        Returns None when the scan can't account for every CLIPTextEncode node
+        (linked or non-string text inputs, unusual key order), so the caller can
+        fall back to the full parse.
+        """
+        matches = self._PROMPT_NODE_RE.findall(prompt_json)
+        if not matches or len(matches) != len(self._CLIP_CLASS_RE.findall(prompt_json)):
+            return None
+        
+        positive_prompts = []
+        for raw_key, raw_text in matches:
+            key = _loads(f'"{raw_key}"')
+            text_content = _loads(f'"{raw_text}"')
+            
+            if key in processed_nodes or not text_content.strip():
+                continue
+            if self._NEGATIVE_WORD_RE.search(text_content, 0, 50) is not None:
+                continue
+            
+            positive_prompts.append({
+                'text': text_content,
+                'node_id': key,
+                'class_type': CLIP_TEXT_ENCODE,
+                'title': f"Node {key}",
+                'source': 'prompt_data'
+            })
+            processed_nodes.add(key)
+        
+        return positive_prompts
+    
     def extract_positive_from_prompt_data(self, prompt_data: Dict, processed_nodes: set) -> List[Dict]:
         """Extract positive prompts from prompt data structure"""
         positive_prompts = []
@@ -370,8 +623,8 @@ class ComfyUIPromptExtractorUI:
                 if key in processed_nodes:
                     continue
                 
-                if class_type == 'CLIPTextEncode':
-                    inputs = value.get('inputs', {})
+                if class_type == CLIP_TEXT_ENCODE:
+                    inputs = value.get('inputs', EMPTY_DICT)
                     
                     # Look for text input
                     text_content = ""
@@ -384,7 +637,7 @@ class ComfyUIPromptExtractorUI:
                         # Only include if it looks like a positive prompt
                         is_negative = (
                             text_content.strip() == '' or
-                            'negative' in str(text_content).lower()[:50]
+                            self._NEGATIVE_WORD_RE.search(str(text_content), 0, 50) is not None
                         )
                         
                         if not is_negative:
@@ -403,8 +656,7 @@ class ComfyUIPromptExtractorUI:
     
     def update_results(self, results, file_paths):
         """Update UI with extraction results"""
-        # Stop progress bar
-        self.progress.stop()
+        # Hide progress bar
         self.progress.grid_remove()
         
         # Re-enable buttons
@@ -422,6 +674,13 @@ class ComfyUIPromptExtractorUI:
         total_prompts = 0
         files_with_prompts = 0
         all_prompt_texts = []
+        # Prompt text -> file it was first shown for; repeats (e.g. seed sweeps) are shown once
+        seen_prompts: Dict[str, str] = {}
+        files_with_prompts_lines = []
+        
+        # Build the text in memory and hand it to each widget in one insert
+        prompt_buf = io.StringIO()
+        summary_buf = io.StringIO()
         
         # Process results
         for i, result in enumerate(results):
@@ -433,60 +692,75 @@ class ComfyUIPromptExtractorUI:
                 total_prompts += len(positive_prompts)
                 
                 # Add to main prompts display
+                filename = file_info.get('filename', 'Unknown')
+                files_with_prompts_lines.append(f"• {filename} ({len(positive_prompts)} prompts)\n")
                 if len(results) > 1:
-                    self.prompt_text.insert(tk.END, f"=== {file_info.get('filename', 'Unknown')} ===\n")
+                    prompt_buf.write(f"=== {filename} ===\n")
                 
                 for j, prompt_info in enumerate(positive_prompts, 1):
                     if len(positive_prompts) > 1:
-                        self.prompt_text.insert(tk.END, f"\nPrompt {j} - {prompt_info.get('title', 'Untitled')}:\n")
-                        self.prompt_text.insert(tk.END, "-" * 40 + "\n")
+                        prompt_buf.write(f"\nPrompt {j} - {prompt_info.get('title', 'Untitled')}:\n")
+                        prompt_buf.write("-" * 40 + "\n")
                     
                     prompt_text = prompt_info['text']
-                    self.prompt_text.insert(tk.END, f"{prompt_text}\n")
-                    all_prompt_texts.append(prompt_text)
+                    first_seen = seen_prompts.get(prompt_text)
+                    if first_seen is None:
+                        seen_prompts[prompt_text] = filename
+                        prompt_buf.write(f"{prompt_text}\n")
+                        all_prompt_texts.append(prompt_text)
+                    else:
+                        prompt_buf.write(f"(Same prompt as {first_seen})\n")
                     
                     if j < len(positive_prompts):
-                        self.prompt_text.insert(tk.END, "\n")
+                        prompt_buf.write("\n")
                 
                 if i < len(results) - 1:
-                    self.prompt_text.insert(tk.END, "\n" + "="*60 + "\n\n")
+                    prompt_buf.write("\n" + "="*60 + "\n\n")
         
         # Update summary
-        self.summary_text.insert(tk.END, f"EXTRACTION SUMMARY\n")
-        self.summary_text.insert(tk.END, f"="*50 + "\n\n")
-        self.summary_text.insert(tk.END, f"Files processed: {len(results)}\n")
-        self.summary_text.insert(tk.END, f"Files with prompts: {files_with_prompts}\n")
-        self.summary_text.insert(tk.END, f"Total positive prompts found: {total_prompts}\n\n")
+        summary_buf.write(f"EXTRACTION SUMMARY\n")
+        summary_buf.write(f"="*50 + "\n\n")
+        summary_buf.write(f"Files processed: {len(results)}\n")
+        summary_buf.write(f"Files with prompts: {files_with_prompts}\n")
+        summary_buf.write(f"Total positive prompts found: {total_prompts}\n")
+        summary_buf.write(f"Unique positive prompts: {len(all_prompt_texts)}\n\n")
         
         if files_with_prompts == 0:
-            self.summary_text.insert(tk.END, "No positive prompts found in any files.\n")
-            self.summary_text.insert(tk.END, "Make sure the PNG files contain ComfyUI workflow metadata.")
+            summary_buf.write("No positive prompts found in any files.\n")
+            summary_buf.write("Make sure the PNG files contain ComfyUI workflow metadata.")
         else:
-            self.summary_text.insert(tk.END, "FILES WITH PROMPTS:\n")
-            self.summary_text.insert(tk.END, "-" * 30 + "\n")
-            
-            for result in results:
-                positive_prompts = result.get('positive_prompts', [])
-                if positive_prompts:
-                    filename = result.get('file_info', {}).get('filename', 'Unknown')
-                    self.summary_text.insert(tk.END, f"• {filename} ({len(positive_prompts)} prompts)\n")
+            summary_buf.write("FILES WITH PROMPTS:\n")
+            summary_buf.write("-" * 30 + "\n")
+            summary_buf.write(''.join(files_with_prompts_lines))
+        
+        self._fill_text(self.prompt_text, prompt_buf.getvalue())
+        self._fill_text(self.summary_text, summary_buf.getvalue())
+        
+        skipped_note = f" ({self._skipped_files} non-PNG files skipped)" if self._skipped_files else ""
         
         # Update status and enable buttons
         if total_prompts > 0:
-            self.status_var.set(f"✓ Extracted {total_prompts} positive prompts from {files_with_prompts} files")
+            self.status_var.set(f"✓ Extracted {total_prompts} positive prompts from {files_with_prompts} files{skipped_note}")
             self.copy_btn.configure(state='normal')
             self.copy_first_btn.configure(state='normal')
             self.save_btn.configure(state='normal')
             
-            # Store all prompts for copying
+            # Store unique prompts for copying
             self.all_prompt_texts = all_prompt_texts
         else:
-            self.status_var.set("✗ No positive prompts found")
+            self.status_var.set(f"✗ No positive prompts found{skipped_note}")
             self.all_prompt_texts = []
     
+    def _fill_text(self, widget, text):
+        """Insert text with the scrollbar detached so Tk doesn't reflow it mid-fill"""
+        scroll_command = widget.cget('yscrollcommand')
+        widget.configure(yscrollcommand='')
+        widget.insert(tk.END, text)
+        widget.configure(yscrollcommand=scroll_command)
+        widget.yview_moveto(0)
+    
     def show_error(self, error_message):
         """Show error message"""
-        self.progress.stop()
         self.progress.grid_remove()
         self.browse_file_btn.configure(state='normal')
         self.browse_folder_btn.configure(state='normal')
@@ -494,13 +768,19 @@ class ComfyUIPromptExtractorUI:
         self.status_var.set(f"✗ Error: {error_message}")
         messagebox.showerror("Error", f"Failed to process file(s):\n{error_message}")
     
+    def _copy_text(self, text):
+        """Put text on the clipboard through Tk, which already owns the selection"""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+        self.root.update()
+    
     def copy_to_clipboard(self):
         """Copy all prompts to clipboard"""
         if hasattr(self, 'all_prompt_texts') and self.all_prompt_texts:
             try:
                 # Join all prompts with double newlines
                 all_text = '\n\n'.join(self.all_prompt_texts)
-                pyperclip.copy(all_text)
+                self._copy_text(all_text)
                 self.status_var.set(f"✓ All {len(self.all_prompt_texts)} prompts copied to clipboard!")
                 
                 # Reset status after 3 seconds
@@ -513,7 +793,7 @@ class ComfyUIPromptExtractorUI:
         """Copy first prompt to clipboard"""
         if hasattr(self, 'all_prompt_texts') and self.all_prompt_texts:
             try:
-                pyperclip.copy(self.all_prompt_texts[0])
+                self._copy_text(self.all_prompt_texts[0])
                 self.status_var.set("✓ First prompt copied to clipboard!")
                 
                 # Reset status after 3 seconds
@@ -541,17 +821,18 @@ class ComfyUIPromptExtractorUI:
             
             if file_path:
                 try:
+                    parts = ["ComfyUI Positive Prompts\n", "=" * 30 + "\n\n"]
+                    
+                    for i, prompt_text in enumerate(self.all_prompt_texts, 1):
+                        if len(self.all_prompt_texts) > 1:
+                            parts.append(f"Prompt {i}:\n")
+                            parts.append("-" * 20 + "\n")
+                        parts.append(f"{prompt_text}\n")
+                        if i < len(self.all_prompt_texts):
+                            parts.append("\n")
+                    
                     with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write("ComfyUI Positive Prompts\n")
-                        f.write("=" * 30 + "\n\n")
-                        
-                        for i, prompt_text in enumerate(self.all_prompt_texts, 1):
-                            if len(self.all_prompt_texts) > 1:
-                                f.write(f"Prompt {i}:\n")
-                                f.write("-" * 20 + "\n")
-                            f.write(f"{prompt_text}\n")
-                            if i < len(self.all_prompt_texts):
-                                f.write("\n")
+                        f.write(''.join(parts))
                     
                     self.status_var.set(f"✓ Prompts saved to {os.path.basename(file_path)}")
                     
@@ -580,16 +861,6 @@ def main():
     # Check if required packages are available
     missing_packages = []
     
-    try:
-        import pyperclip
-    except ImportError:
-        missing_packages.append('pyperclip')
-    
-    try:
-        from PIL import Image
-    except ImportError:
-        missing_packages.append('Pillow')
-    
     # Check for drag and drop support
     if not HAS_DND:
         print("Note: For drag & drop functionality, install tkinterdnd2:")
@@ -1,9 +1,106 @@
 import json
 import sys
 import os
+import argparse
+import mmap
 import glob
-from PIL import Image
-from typing import Dict, Any, List, Optional
+import re
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, NamedTuple, Optional
+
+# Use orjson for the (often large) workflow JSON when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# PNG IHDR color type -> PIL mode name
+PNG_COLOR_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+# Matches CLIPTextEncode and its variants (CLIPTextEncodeSDXL, ...) in any case.
+# Every node the extractors accept has this in its raw JSON, so blobs without
+# it can be skipped without parsing.
+_CLIPTEXT_RE = re.compile(r'cliptext', re.I)
+
+_CHUNK_HEADER = struct.Struct('>I4s')
+
+class PromptInfo(NamedTuple):
+    """A single extracted positive prompt"""
+    text: str
+    node_id: Any
+    node_type: str  # Workflow node type, or the class_type of a prompt_data entry
+    title: str
+    source: str  # 'workflow' or 'prompt_data'
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict layout used in saved JSON files"""
+        type_key = 'node_type' if self.source == 'workflow' else 'class_type'
+        return {
+            'text': self.text,
+            'node_id': self.node_id,
+            type_key: self.node_type,
+            'title': self.title,
+            'source': self.source
+        }
+
+def _read_png_text_chunks(file_path: str):
+    """Return (header, {keyword: text}) from the chunks in front of the first IDAT"""
+    header = {'size': None, 'mode': None}
+    text_chunks = {}
+    
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("File is not a PNG")
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 8
+            end = len(mm)
+            while offset + 8 <= end:
+                length, ctype = _CHUNK_HEADER.unpack_from(mm, offset)
+                data_start = offset + 8
+                offset = data_start + length + 4  # Skip data + CRC
+                
+                if ctype in (b'IDAT', b'IEND'):
+                    break
+                
+                if ctype not in (b'IHDR', b'tEXt', b'zTXt', b'iTXt'):
+                    continue
+                
+                if data_start + length > end:
+                    break  # Truncated file
+                data = mm[data_start:data_start + length]
+                
+                try:
+                    if ctype == b'IHDR':
+                        width, height = struct.unpack_from('>II', data)
+                        header['size'] = (width, height)
+                        header['mode'] = PNG_COLOR_MODES.get(data[9], 'Unknown')
+                    elif ctype == b'tEXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        text_chunks[keyword.decode('latin-1')] = value.decode('latin-1')
+                    elif ctype == b'zTXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        # value[0] is the compression method (always zlib)
+                        text_chunks[keyword.decode('latin-1')] = zlib.decompress(value[1:]).decode('latin-1')
+                    else:
+                        keyword, _, rest = data.partition(b'\x00')
+                        compressed = rest[0]
+                        # Skip compression method, then language tag and translated keyword
+                        _language, _, rest = rest[2:].partition(b'\x00')
+                        _translated, _, value = rest.partition(b'\x00')
+                        if compressed:
+                            value = zlib.decompress(value)
+                        text_chunks[keyword.decode('latin-1')] = value.decode('utf-8')
+                except (IndexError, struct.error, zlib.error, UnicodeDecodeError) as e:
+                    print(f"Warning: Skipping malformed {ctype.decode('latin-1')} chunk: {e}")
+    
+    return header, text_chunks
 
 def extract_positive_prompts_only(file_path: str) -> Dict[str, Any]:
     """
@@ -16,141 +113,147 @@ def extract_positive_prompts_only(file_path: str) -> Dict[str, Any]:
         Dictionary containing extracted positive prompts only
     """
     try:
-        with Image.open(file_path) as img:
-            if img.format != 'PNG':
-                raise ValueError(f"File is not a PNG: {img.format}")
-            
-            metadata = img.info
-            result = {
-                'file_info': {
-                    'filename': os.path.basename(file_path),
-                    'size': img.size,
-                    'mode': img.mode
-                },
-                'positive_prompts': []
-            }
-            
-            # Track processed node IDs to avoid duplicates
-            processed_nodes = set()
-            
-            # Try workflow first (usually more detailed)
-            if 'workflow' in metadata:
-                try:
-                    workflow_data = json.loads(metadata['workflow'])
-                    prompts = extract_positive_from_workflow(workflow_data, processed_nodes)
-                    result['positive_prompts'].extend(prompts)
-                except json.JSONDecodeError as e:
-                    print(f"Warning: Could not parse workflow JSON: {e}")
-            
-            # Only check prompt data if we didn't find anything in workflow
-            if not result['positive_prompts'] and 'prompt' in metadata:
-                try:
-                    prompt_data = json.loads(metadata['prompt'])
-                    prompts = extract_positive_from_prompt_data(prompt_data, processed_nodes)
-                    result['positive_prompts'].extend(prompts)
-                except json.JSONDecodeError as e:
-                    print(f"Warning: Could not parse prompt JSON: {e}")
-            
-            return result
-            
+        header, metadata = _read_png_text_chunks(file_path)
+        result = {
+            'file_info': {
+                'filename': os.path.basename(file_path),
+                'size': header['size'],
+                'mode': header['mode']
+            },
+            'positive_prompts': []
+        }
+        
+        # Track processed node IDs to avoid duplicates
+        processed_nodes = set()
+        
+        # Try workflow first (usually more detailed)
+        if 'workflow' in metadata and _CLIPTEXT_RE.search(metadata['workflow']):
+            try:
+                workflow_data = _loads(metadata['workflow'])
+                prompts = extract_positive_from_workflow(workflow_data, processed_nodes)
+                result['positive_prompts'].extend(prompts)
+            except json.JSONDecodeError as e:
+                print(f"Warning: Could not parse workflow JSON: {e}")
+        
+        # Only check prompt data if we didn't find anything in workflow
+        if (not result['positive_prompts'] and 'prompt' in metadata and
+                _CLIPTEXT_RE.search(metadata['prompt'])):
+            try:
+                prompt_data = _loads(metadata['prompt'])
+                prompts = extract_positive_from_prompt_data(prompt_data, processed_nodes)
+                result['positive_prompts'].extend(prompts)
+            except json.JSONDecodeError as e:
+                print(f"Warning: Could not parse prompt JSON: {e}")
+        
+        return result
+        
     except Exception as e:
         raise Exception(f"Error reading PNG file: {e}")
 
-def extract_positive_from_workflow(workflow_data: Dict, processed_nodes: set) -> List[Dict]:
+def extract_positive_from_workflow(workflow_data: Dict, processed_nodes: set) -> List[PromptInfo]:
     """Extract positive prompts from workflow nodes"""
     positive_prompts = []
     
     nodes = workflow_data.get('nodes', [])
+    # Local alias for the unbound method; avoids a bound-method lookup per call in the loops below
+    _get = dict.get
+    
+    # Keep only CLIPTextEncode-like nodes; these are a small fraction of a typical workflow
+    candidates = [
+        node for node in nodes
+        if _CLIPTEXT_RE.search(_get(node, 'type', '')) or
+        (_get(node, 'properties') or {}).get('Node name for S&R') == 'CLIPTextEncode'
+    ]
     
-    for node in nodes:
-        node_id = node.get('id')
-        node_type = node.get('type', '')
-        title = node.get('title', '').lower()
+    for node in candidates:
+        node_id = _get(node, 'id')
         
         # Skip if already processed
         if node_id in processed_nodes:
             continue
         
-        # Look for CLIPTextEncode nodes
-        if (node_type == 'CLIPTextEncode' or 
-            'cliptext' in node_type.lower() or 
-            node.get('properties', {}).get('Node name for S&R') == 'CLIPTextEncode'):
+        node_type = _get(node, 'type', '')
+        title = _get(node, 'title', '').lower()
+        
+        widgets_values = _get(node, 'widgets_values', [])
+        
+        if widgets_values and len(widgets_values) > 0:
+            prompt_text = widgets_values[0]
+            stripped = prompt_text.strip()
+            # Lowercase only the part of the prompt that is inspected
+            head = prompt_text[:50].lower()
             
-            widgets_values = node.get('widgets_values', [])
+            # Only include if it's likely a positive prompt
+            is_positive = (
+                'positive' in title or 
+                'pos' in title or
+                (title in ('', 'untitled') and stripped != '' and 'negative' not in head)
+            )
             
-            if widgets_values and len(widgets_values) > 0:
-                prompt_text = widgets_values[0]
-                
-                # Only include if it's likely a positive prompt
-                is_positive = (
-                    'positive' in title or 
-                    'pos' in title or
-                    (title == '' and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50]) or
-                    (title == 'untitled' and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50])
-                )
-                
-                # Exclude obvious negative prompts
-                is_negative = (
-                    'negative' in title or 
-                    'neg' in title or
-                    prompt_text.strip() == '' or
-                    prompt_text.lower().strip().startswith('negative')
+            # Exclude obvious negative prompts
+            is_negative = (
+                'negative' in title or 
+                'neg' in title or
+                stripped == '' or
+                stripped[:8].lower() == 'negative'
+            )
+            
+            if is_positive and not is_negative:
+                prompt_info = PromptInfo(
+                    text=prompt_text,
+                    node_id=node_id,
+                    node_type=node_type,
+                    title=_get(node, 'title', 'Untitled'),
+                    source='workflow'
                 )
                 
-                if is_positive and not is_negative:
-                    prompt_info = {
-                        'text': prompt_text,
-                        'node_id': node_id,
-                        'node_type': node_type,
-                        'title': node.get('title', 'Untitled'),
-                        'source': 'workflow'
-                    }
-                    
-                    positive_prompts.append(prompt_info)
-                    processed_nodes.add(node_id)
-    
+                positive_prompts.append(prompt_info)
+                processed_nodes.add(node_id)
+
     return positive_prompts
 
-def extract_positive_from_prompt_data(prompt_data: Dict, processed_nodes: set) -> List[Dict]:
+def extract_positive_from_prompt_data(prompt_data: Dict, processed_nodes: set) -> List[PromptInfo]:
     """Extract positive prompts from prompt data structure"""
     positive_prompts = []
+    _get = dict.get
+    processed_add = processed_nodes.add
     
-    for key, value in prompt_data.items():
-        if isinstance(value, dict):
-            class_type = value.get('class_type', '')
-            
-            # Skip if already processed
-            if key in processed_nodes:
-                continue
+    # Only unprocessed CLIP text encoder entries; prompt values are always plain dicts
+    candidates = (
+        (key, value) for key, value in prompt_data.items()
+        if type(value) is dict and key not in processed_nodes and
+        _CLIPTEXT_RE.match(_get(value, 'class_type', ''))
+    )
+    
+    for key, value in candidates:
+        class_type = value['class_type']
+        inputs = _get(value, 'inputs', {})
+        
+        # Look for text input
+        text_content = ""
+        if 'text' in inputs:
+            text_content = inputs['text']
+        elif 'prompt' in inputs:
+            text_content = inputs['prompt']
+        
+        if text_content and text_content.strip():
+            # Only include if it looks like a positive prompt
+            is_negative = (
+                text_content.strip() == '' or
+                'negative' in str(text_content)[:50].lower()
+            )
             
-            if class_type == 'CLIPTextEncode':
-                inputs = value.get('inputs', {})
-                
-                # Look for text input
-                text_content = ""
-                if 'text' in inputs:
-                    text_content = inputs['text']
-                elif 'prompt' in inputs:
-                    text_content = inputs['prompt']
+            if not is_negative:
+                prompt_info = PromptInfo(
+                    text=text_content,
+                    node_id=key,
+                    node_type=class_type,
+                    title=f"Node {key}",
+                    source='prompt_data'
+                )
                 
-                if text_content and text_content.strip():
-                    # Only include if it looks like a positive prompt
-                    is_negative = (
-                        text_content.strip() == '' or
-                        'negative' in str(text_content).lower()[:50]
-                    )
-                    
-                    if not is_negative:
-                        prompt_info = {
-                            'text': text_content,
-                            'node_id': key,
-                            'class_type': class_type,
-                            'title': f"Node {key}",
-                            'source': 'prompt_data'
-                        }
-                        
-                        positive_prompts.append(prompt_info)
-                        processed_nodes.add(key)
+                positive_prompts.append(prompt_info)
+                processed_add(key)
     
     return positive_prompts
 
@@ -164,7 +267,7 @@ def print_positive_prompts(result: Dict[str, Any], prompt_only: bool = False, pr
 
     if prompt_only:
         for prompt_info in positive_prompts:
-            print(prompt_info['text'])
+            print(prompt_info.text)
         return
 
     print("=" * 80)
@@ -180,9 +283,9 @@ def print_positive_prompts(result: Dict[str, Any], prompt_only: bool = False, pr
         print("-" * 60)
         
         for i, prompt_info in enumerate(positive_prompts, 1):
-            print(f"\n#{i} - {prompt_info.get('title', 'Untitled')} (Node: {prompt_info.get('node_id', 'Unknown')})")
-            print(f"Type: {prompt_info.get('node_type', prompt_info.get('class_type', 'Unknown'))}")
-            print(f"Text: {prompt_info['text']}")
+            print(f"\n#{i} - {prompt_info.title} (Node: {prompt_info.node_id})")
+            print(f"Type: {prompt_info.node_type}")
+            print(f"Text: {prompt_info.text}")
     else:
         print("\n❌ No positive prompts found in this image")
 
@@ -197,159 +300,226 @@ def save_positive_prompts(result: Dict[str, Any], output_path: str, format_type:
             return
         
         if format_type.lower() == 'txt':
+            # Assemble the whole file first and write it in one call
+            parts = ["ComfyUI Positive Prompts\n", "=" * 30 + "\n\n"]
+            
+            for i, prompt_info in enumerate(positive_prompts, 1):
+                if len(positive_prompts) > 1:
+                    parts.append(f"Prompt {i} - {prompt_info.title}:\n")
+                    parts.append("-" * 40 + "\n")
+                parts.append(f"{prompt_info.text}\n")
+                if i < len(positive_prompts):
+                    parts.append("\n")
+            
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write("ComfyUI Positive Prompts\n")
-                f.write("=" * 30 + "\n\n")
-                
-                for i, prompt_info in enumerate(positive_prompts, 1):
-                    if len(positive_prompts) > 1:
-                        f.write(f"Prompt {i} - {prompt_info.get('title', 'Untitled')}:\n")
-                        f.write("-" * 40 + "\n")
-                    f.write(f"{prompt_info['text']}\n")
-                    if i < len(positive_prompts):
-                        f.write("\n")
+                f.write(''.join(parts))
         
         elif format_type.lower() == 'json':
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            # PromptInfo tuples become plain dicts only here, at the serialization boundary
+            result = dict(result, positive_prompts=[p.to_dict() for p in positive_prompts])
+            if orjson is not None:
+                # orjson emits UTF-8 bytes directly, so no text-layer encoding is needed
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, indent=2, ensure_ascii=False)
         
         print(f"✓ Positive prompts saved to: {output_path}")
         
     except Exception as e:
         print(f"✗ Error saving prompts: {e}")
 
-def main():
-    """Main function"""
-    args = sys.argv[1:]
-    if not args or '--help' in args:
-        print("ComfyUI Positive Prompt Extractor")
-        print("Usage: python comfyprompt_extractor.py <files_or_dirs...|wildcards> [options]")
-        print("\nThis script extracts positive prompts from ComfyUI-generated PNG files.")
-        print("It can process individual files, directories, or wildcard patterns.")
-        print("\nOptions:")
-        print("  --prompt-only       Extract the prompt text only, without any other information.")
-        print("  --prompt-only-json  Extract the prompt text only, in JSON format.")
-        print("  --save-txt          Save prompts to a text file for each image.")
-        print("  --save-json         Save prompts to a JSON file for each image.")
-        print("  --output <dir>      Specify an output directory for the saved files.")
-        print("  --help              Show this help message.")
-        print("\nExamples:")
-        print("  - Process a single image:")
-        print("    python comfyprompt_extractor.py my_image.png")
-        print("\n  - Process all PNGs in a directory:")
-        print("    python comfyprompt_extractor.py /path/to/images/")
-        print("\n  - Process PNGs using a wildcard and save to text:")
-        print("    python comfyprompt_extractor.py images/*.png --save-txt")
-        print("\n  - Process multiple inputs and save to a specific output directory:")
-        print("    python comfyprompt_extractor.py image1.png /path/to/more_images/ --save-json --output /path/to/prompts/")
-        return
+def _iter_png_files(root: str):
+    """
+    Recursively yield the paths of PNG files below a directory
+    
+    Uses os.scandir so file/directory checks come from the cached directory
+    entries instead of an extra stat per file. Hidden entries are skipped,
+    matching the previous glob("**/*.png") behavior.
+    """
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file() and entry.name.lower().endswith('.png'):
+                        yield entry.path
+        except OSError:
+            continue
+
+def _process_one(file_path: str):
+    """
+    Extract the positive prompts of a single file, without printing or saving
+    
+    Runs in a worker process, so failures are returned instead of raised.
+    
+    Args:
+        file_path: Path to the PNG file
+        
+    Returns:
+        Tuple of (file_path, result, prompt texts, error message or None)
+    """
+    try:
+        result = extract_positive_prompts_only(file_path)
+    except Exception as e:
+        return file_path, None, [], str(e)
+    
+    extracted_texts = [prompt_info.text for prompt_info in result.get('positive_prompts', [])]
+    return file_path, result, extracted_texts, None
 
-    paths = [arg for arg in args if not arg.startswith('--')]
-    options = [arg for arg in args if arg.startswith('--')]
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(
+        prog="comfyprompt_extractor.py",
+        description="ComfyUI Positive Prompt Extractor\n\n"
+                    "This script extracts positive prompts from ComfyUI-generated PNG files.\n"
+                    "It can process individual files, directories, or wildcard patterns.",
+        epilog="Examples:\n"
+               "  - Process a single image:\n"
+               "    python comfyprompt_extractor.py my_image.png\n"
+               "\n  - Process all PNGs in a directory:\n"
+               "    python comfyprompt_extractor.py /path/to/images/\n"
+               "\n  - Process PNGs using a wildcard and save to text:\n"
+               "    python comfyprompt_extractor.py images/*.png --save-txt\n"
+               "\n  - Process multiple inputs and save to a specific output directory:\n"
+               "    python comfyprompt_extractor.py image1.png /path/to/more_images/ --save-json --output /path/to/prompts/",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('paths', nargs='+', metavar='files_or_dirs',
+                        help="PNG files, directories or wildcard patterns")
+    parser.add_argument('--prompt-only', action='store_true',
+                        help="Extract the prompt text only, without any other information.")
+    parser.add_argument('--prompt-only-json', action='store_true',
+                        help="Extract the prompt text only, in JSON format.")
+    parser.add_argument('--save-txt', action='store_true',
+                        help="Save prompts to a text file for each image.")
+    parser.add_argument('--save-json', action='store_true',
+                        help="Save prompts to a JSON file for each image.")
+    parser.add_argument('--output', metavar='dir',
+                        help="Specify an output directory for the saved files.")
+    parser.add_argument('--sort', action='store_true',
+                        help="Process files in sorted path order instead of discovery order.")
+    return parser
 
-    if not paths:
-        print("✗ Error: No input files, directories, or patterns specified.")
-        print("Use --help for usage instructions.")
+def main():
+    """Main function"""
+    parser = build_arg_parser()
+    if len(sys.argv) < 2:
+        parser.print_help()
         return
+    
+    args = parser.parse_args()
 
-    files_to_process = set()
-    for path_arg in paths:
+    # Dict keys dedupe while keeping discovery order (grouped by directory)
+    files_to_process = {}
+    for path_arg in args.paths:
         # If path is a directory, search for PNGs inside it
         if os.path.isdir(path_arg):
-            search_pattern = os.path.join(path_arg, '**', '*.png')
-            found_files = glob.glob(search_pattern, recursive=True)
-            for f in found_files:
-                files_to_process.add(f)
+            files_to_process.update(dict.fromkeys(_iter_png_files(path_arg)))
         # Otherwise, treat it as a glob pattern (which also works for single files)
         else:
-            found_files = glob.glob(path_arg, recursive=True)
-            for f in found_files:
-                 if os.path.isfile(f) and f.lower().endswith('.png'):
-                    files_to_process.add(f)
+            for f in glob.iglob(path_arg, recursive=True):
+                if f.lower().endswith('.png') and os.path.isfile(f):
+                    files_to_process[f] = None
 
-    files_to_process = sorted(list(files_to_process))
+    if args.sort:
+        files_to_process = sorted(files_to_process)
+    else:
+        files_to_process = list(files_to_process)
 
     if not files_to_process:
         print("No PNG files found matching the specified paths/patterns.")
         return
     
-    prompt_only = '--prompt-only' in options
-    prompt_only_json = '--prompt-only-json' in options
+    prompt_only = args.prompt_only
+    prompt_only_json = args.prompt_only_json
 
     if not prompt_only and not prompt_only_json:
         print(f"Found {len(files_to_process)} PNG files to process.")
 
     # Get save options
-    save_txt = '--save-txt' in options
-    save_json = '--save-json' in options
+    save_txt = args.save_txt
+    save_json = args.save_json
     
-    output_dir = None
-    if '--output' in options:
+    output_dir = args.output
+    if output_dir and not os.path.exists(output_dir):
         try:
-            # Find the value associated with --output
-            output_dir_index = -1
-            for i, arg in enumerate(args):
-                if arg == '--output':
-                    output_dir_index = i + 1
-                    break
-            
-            if output_dir_index != -1 and output_dir_index < len(args) and not args[output_dir_index].startswith('--'):
-                output_dir = args[output_dir_index]
-                if not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                    print(f"Created output directory: {output_dir}")
-            else:
-                print("✗ Error: --output flag requires a directory path argument.")
-                return
-        except Exception as e:
-            print(f"Error parsing --output argument: {e}")
+            os.makedirs(output_dir)
+            print(f"Created output directory: {output_dir}")
+        except OSError as e:
+            print(f"✗ Error creating output directory: {e}")
             return
 
-    all_prompts = []
-    for file_path in files_to_process:
-        try:
-            result = extract_positive_prompts_only(file_path)
+    # Extraction runs in worker processes for larger batches; printing and saving stay here
+    if len(files_to_process) < 4:
+        processed = map(_process_one, files_to_process)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+        processed = executor.map(_process_one, files_to_process, chunksize=8)
+
+    # --prompt-only-json streams the array as prompts arrive instead of collecting them
+    first_prompt = True
+    if prompt_only_json:
+        sys.stdout.write('[')
+    try:
+        for file_path, result, extracted_texts, error in processed:
+            try:
+                if error is not None:
+                    raise Exception(error)
             
-            if prompt_only_json:
-                for prompt_info in result.get('positive_prompts', []):
-                    all_prompts.append(prompt_info['text'])
-                continue
+                if prompt_only_json:
+                    for text in extracted_texts:
+                        sys.stdout.write(('\n  ' if first_prompt else ',\n  ') + json.dumps(text))
+                        first_prompt = False
+                    continue
 
-            print_positive_prompts(result, prompt_only)
+                print_positive_prompts(result, prompt_only)
             
-            if not result.get('positive_prompts'):
-                continue
+                if not result.get('positive_prompts'):
+                    continue
 
-            # Determine output path
-            base_name = os.path.splitext(os.path.basename(file_path))[0]
+                # Determine output path
+                base_name = os.path.splitext(os.path.basename(file_path))[0]
             
-            def get_output_path(extension):
-                if output_dir:
-                    return os.path.join(output_dir, f"{base_name}_positive_prompts.{extension}")
-                # Place the output file next to the input file
-                return f"{os.path.splitext(file_path)[0]}_positive_prompts.{extension}"
-
-            if save_txt:
-                save_positive_prompts(result, get_output_path('txt'), 'txt')
+                def get_output_path(extension):
+                    if output_dir:
+                        return os.path.join(output_dir, f"{base_name}_positive_prompts.{extension}")
+                    # Place the output file next to the input file
+                    return f"{os.path.splitext(file_path)[0]}_positive_prompts.{extension}"
+
+                if save_txt:
+                    save_positive_prompts(result, get_output_path('txt'), 'txt')
             
-            if save_json:
-                save_positive_prompts(result, get_output_path('json'), 'json')
-
-            # Interactive save only for single files when no save flag is present
-            if len(files_to_process) == 1 and not (save_txt or save_json):
-                if not prompt_only:
-                    print("\n" + "="*60)
-                    choice = input("Save positive prompts? (t)ext, (j)son, (n)o: ").lower()
-                    if choice == 't':
-                        save_positive_prompts(result, get_output_path('txt'), 'txt')
-                    elif choice == 'j':
-                        save_positive_prompts(result, get_output_path('json'), 'json')
-
-        except Exception as e:
-            print(f"✗ Error processing {os.path.basename(file_path)}: {e}")
+                if save_json:
+                    save_positive_prompts(result, get_output_path('json'), 'json')
+
+                # Interactive save only for single files when no save flag is present
+                if len(files_to_process) == 1 and not (save_txt or save_json):
+                    if not prompt_only:
+                        print("\n" + "="*60)
+                        choice = input("Save positive prompts? (t)ext, (j)son, (n)o: ").lower()
+                        if choice == 't':
+                            save_positive_prompts(result, get_output_path('txt'), 'txt')
+                        elif choice == 'j':
+                            save_positive_prompts(result, get_output_path('json'), 'json')
+
+            except Exception as e:
+                # Keep the streamed JSON on stdout parseable
+                print(f"✗ Error processing {os.path.basename(file_path)}: {e}",
+                      file=sys.stderr if prompt_only_json else sys.stdout)
+    finally:
+        # Runs on Ctrl+C too, so the worker processes never outlive main()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     if prompt_only_json:
-        print(json.dumps(all_prompts, indent=2))
+        sys.stdout.write(']\n' if first_prompt else '\n]\n')
 
 
 if __name__ == "__main__":
@@ -1,9 +1,83 @@
 import json
 import sys
 import os
-from PIL import Image
+import mmap
+import struct
+import zlib
+from collections import Counter
 from typing import Dict, Any, Optional
 
+# Use orjson for the (often large) workflow JSON when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# PNG IHDR color type -> PIL mode name
+PNG_COLOR_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+_CHUNK_HEADER = struct.Struct('>I4s')
+
+# Metadata keys ComfyUI itself writes
+COMFYUI_KEYS = frozenset({'workflow', 'prompt', 'Workflow', 'Prompt'})
+
+def _read_png_text_chunks(file_path: str):
+    """Collect the IHDR size/mode and every text chunk, stopping at the pixel data"""
+    header = {'size': None, 'mode': None}
+    text_chunks = {}
+    
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("File is not a PNG")
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 8
+            end = len(mm)
+            while offset + 8 <= end:
+                length, ctype = _CHUNK_HEADER.unpack_from(mm, offset)
+                data_start = offset + 8
+                offset = data_start + length + 4  # Skip data + CRC
+                
+                if ctype in (b'IDAT', b'IEND'):
+                    break
+                
+                if ctype not in (b'IHDR', b'tEXt', b'zTXt', b'iTXt'):
+                    continue
+                
+                if data_start + length > end:
+                    break  # Truncated file
+                data = mm[data_start:data_start + length]
+                
+                try:
+                    if ctype == b'IHDR':
+                        width, height = struct.unpack_from('>II', data)
+                        header['size'] = (width, height)
+                        header['mode'] = PNG_COLOR_MODES.get(data[9], 'Unknown')
+                    elif ctype == b'tEXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        text_chunks[keyword.decode('latin-1')] = value.decode('latin-1')
+                    elif ctype == b'zTXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        # value[0] is the compression method (always zlib)
+                        text_chunks[keyword.decode('latin-1')] = zlib.decompress(value[1:]).decode('latin-1')
+                    else:
+                        keyword, _, rest = data.partition(b'\x00')
+                        compressed = rest[0]
+                        # Skip compression method, then language tag and translated keyword
+                        _language, _, rest = rest[2:].partition(b'\x00')
+                        _translated, _, value = rest.partition(b'\x00')
+                        if compressed:
+                            value = zlib.decompress(value)
+                        text_chunks[keyword.decode('latin-1')] = value.decode('utf-8')
+                except (IndexError, struct.error, zlib.error, UnicodeDecodeError) as e:
+                    print(f"Warning: Skipping malformed {ctype.decode('latin-1')} chunk: {e}")
+    
+    return header, text_chunks
+
 def extract_comfyui_workflow(file_path: str) -> Dict[str, Any]:
     """
     Extract ComfyUI workflow and prompt data from PNG metadata
@@ -15,50 +89,54 @@ def extract_comfyui_workflow(file_path: str) -> Dict[str, Any]:
         Dictionary containing workflow data
     """
     try:
-        with Image.open(file_path) as img:
-            if img.format != 'PNG':
-                raise ValueError(f"File is not a PNG: {img.format}")
-            
-            metadata = img.info
-            result = {
-                'file_info': {
-                    'filename': os.path.basename(file_path),
-                    'size': img.size,
-                    'mode': img.mode
-                },
-                'comfyui_data': {}
-            }
-            
-            # Look for ComfyUI specific keys
-            comfyui_keys = ['workflow', 'prompt', 'Workflow', 'Prompt']
-            
-            for key in metadata:
-                if key in comfyui_keys:
-                    try:
-                        # Try to parse as JSON
-                        parsed_data = json.loads(metadata[key])
-                        result['comfyui_data'][key.lower()] = parsed_data
-                    except json.JSONDecodeError:
-                        # If not JSON, store as string
-                        result['comfyui_data'][key.lower()] = metadata[key]
-                elif 'comfy' in key.lower() or 'workflow' in key.lower():
-                    # Catch any other ComfyUI-related keys
-                    try:
-                        parsed_data = json.loads(metadata[key])
-                        result['comfyui_data'][key] = parsed_data
-                    except json.JSONDecodeError:
-                        result['comfyui_data'][key] = metadata[key]
-            
-            return result
+        header, metadata = _read_png_text_chunks(file_path)
+        result = {
+            'file_info': {
+                'filename': os.path.basename(file_path),
+                'size': header['size'],
+                'mode': header['mode']
+            },
+            'comfyui_data': {}
+        }
+        
+        comfyui_data = result['comfyui_data']
+        for key in metadata:
+            if key in COMFYUI_KEYS:
+                # Known ComfyUI keys are stored lowercased
+                out_key = key.lower()
+            else:
+                # Catch any other ComfyUI-related keys
+                key_lower = key.lower()
+                if 'comfy' not in key_lower and 'workflow' not in key_lower:
+                    continue
+                out_key = key
             
+            try:
+                # Try to parse as JSON
+                comfyui_data[out_key] = _loads(metadata[key])
+            except json.JSONDecodeError:
+                # If not JSON, store as string
+                comfyui_data[out_key] = metadata[key]
+        
+        return result
+        
     except Exception as e:
         raise Exception(f"Error reading PNG file: {e}")
 
+def _write_json(data: Any, output_path: str):
+    """Write data as indented UTF-8 JSON in a single write"""
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    with open(output_path, 'wb') as f:
+        f.write(payload)
+
 def save_workflow_json(workflow_data: Dict[str, Any], output_path: str):
     """Save workflow data to JSON file"""
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(workflow_data, f, indent=2, ensure_ascii=False)
+        _write_json(workflow_data, output_path)
         print(f"✓ Workflow saved to: {output_path}")
     except Exception as e:
         print(f"✗ Error saving workflow: {e}")
@@ -67,8 +145,7 @@ def save_workflow_only(workflow_data: Dict[str, Any], output_path: str):
     """Save only the workflow part (for direct import to ComfyUI)"""
     try:
         if 'workflow' in workflow_data.get('comfyui_data', {}):
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(workflow_data['comfyui_data']['workflow'], f, indent=2, ensure_ascii=False)
+            _write_json(workflow_data['comfyui_data']['workflow'], output_path)
             print(f"✓ Workflow-only file saved to: {output_path}")
         else:
             print("✗ No workflow data found to save")
@@ -106,10 +183,7 @@ def print_workflow_summary(workflow_data: Dict[str, Any]):
                 print(f"  - Nodes: {len(nodes)}")
                 
                 if nodes:
-                    node_types = {}
-                    for node in nodes:
-                        node_type = node.get('type', 'Unknown')
-                        node_types[node_type] = node_types.get(node_type, 0) + 1
+                    node_types = Counter(node.get('type', 'Unknown') for node in nodes)
                     
                     print("  - Node types:")
                     for node_type, count in sorted(node_types.items()):
@@ -128,10 +202,10 @@ def print_workflow_summary(workflow_data: Dict[str, Any]):
                 print(f"  - Prompt entries: {len(value)}")
                 
                 # Look for common ComfyUI node types in prompt
-                node_classes = set()
-                for prompt_key, prompt_value in value.items():
-                    if isinstance(prompt_value, dict) and 'class_type' in prompt_value:
-                        node_classes.add(prompt_value['class_type'])
+                node_classes = {
+                    prompt_value['class_type'] for prompt_value in value.values()
+                    if isinstance(prompt_value, dict) and 'class_type' in prompt_value
+                }
                 
                 if node_classes:
                     print("  - Node classes used:")
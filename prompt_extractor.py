@@ -1,8 +1,183 @@
 import json
 import sys
 import os
-from PIL import Image
-from typing import Dict, Any, Optional
+import functools
+import glob
+import mmap
+import re
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# Use orjson for large JSON parameter blobs when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+_CHUNK_HEADER = struct.Struct('>I4s')
+
+# PNG IHDR color type -> PIL mode name
+PNG_COLOR_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+# Report separators
+_BAR60 = "=" * 60
+_BAR40 = "-" * 40
+
+# Leading JSON whitespace followed by an object or array
+_JSON_CONTAINER_RE = re.compile(r'[ \t\n\r]*[{\[]')
+
+# "Positive prompt:" at the start of a line (after optional whitespace), and the rest of that line
+_POSITIVE_LINE_RE = re.compile(r'^[^\S\n]*positive prompt:(.*)$', re.I | re.M)
+# The line following a match position
+_NEXT_LINE_RE = re.compile(r'\n([^\n]*)')
+
+# Key names used for the positive prompt in JSON parameters, in priority order
+POSITIVE_KEYS = (
+    'Positive prompt',
+    'positive prompt',
+    'Positive Prompt',
+    'positive_prompt',
+    'prompt',
+    'Prompt'
+)
+
+def _read_png_text(file_path: str, keyword: bytes = b'parameters') -> Tuple[Dict[str, Any], List[str], Optional[str]]:
+    """
+    Read a PNG's header, text chunk keywords and one text chunk, without PIL
+    
+    Only the chunks in front of the image data are visited, the same ones
+    PIL exposes in img.info on open. Other text chunks (e.g. a large
+    workflow) only have their keyword read, never their payload.
+    
+    Args:
+        file_path: Path to the PNG file
+        keyword: Text chunk keyword whose value is decoded
+        
+    Returns:
+        Tuple of (header dict with 'size' and 'mode', text chunk keywords,
+        decoded text of the keyword chunk or None if it is not present)
+    """
+    header = {'size': None, 'mode': None}
+    keys = {}
+    text = None
+    found = False
+    
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("File is not a PNG")
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 8
+            end = len(mm)
+            while offset + 8 <= end:
+                length, ctype = _CHUNK_HEADER.unpack_from(mm, offset)
+                data_start = offset + 8
+                data_end = data_start + length
+                offset = data_end + 4  # Skip data + CRC
+                
+                if ctype in (b'IDAT', b'IEND'):
+                    break
+                
+                if ctype not in (b'IHDR', b'tEXt', b'zTXt', b'iTXt'):
+                    continue
+                
+                if data_end > end:
+                    break  # Truncated file
+                
+                if ctype == b'IHDR':
+                    if length >= 13:
+                        header['size'] = struct.unpack_from('>II', mm, data_start)
+                        header['mode'] = PNG_COLOR_MODES.get(mm[data_start + 9], 'Unknown')
+                    continue
+                
+                # Keywords are at most 79 bytes, so the NUL is searched for in place
+                nul = mm.find(b'\x00', data_start, min(data_start + 80, data_end))
+                if nul < 0:
+                    continue
+                name = mm[data_start:nul]
+                keys[name.decode('latin-1')] = None
+                if name != keyword or found:
+                    continue
+                found = True
+                
+                value = mm[nul + 1:data_end]
+                try:
+                    if ctype == b'tEXt':
+                        text = value.decode('latin-1')
+                    elif ctype == b'zTXt':
+                        # value[0] is the compression method (always zlib)
+                        text = zlib.decompress(value[1:]).decode('latin-1')
+                    else:
+                        # iTXt: compression flag and method, then language tag and translated keyword
+                        compressed = value[0]
+                        _language, _, rest = value[2:].partition(b'\x00')
+                        _translated, _, data = rest.partition(b'\x00')
+                        if compressed:
+                            data = zlib.decompress(data)
+                        text = data.decode('utf-8')
+                except (IndexError, zlib.error, UnicodeDecodeError) as e:
+                    print(f"Warning: Skipping malformed {ctype.decode('latin-1')} chunk: {e}")
+    
+    return header, list(keys), text
+
+class ParametersContent:
+    """
+    Contents of a PNG 'parameters' chunk, parsed as JSON only when first needed
+    
+    Attributes:
+        raw: The parameters text as stored in the PNG
+        type: 'json' if the text is a JSON object/array, otherwise 'string'
+        data: The parsed JSON, or the raw text for 'string' parameters
+    """
+    
+    def __init__(self, raw: str):
+        self.raw = raw
+    
+    @cached_property
+    def _parsed(self) -> Tuple[bool, Any]:
+        # Plain-text (A1111-style) parameters skip the JSON parser entirely
+        if _JSON_CONTAINER_RE.match(self.raw):
+            try:
+                return True, _loads(self.raw)
+            except json.JSONDecodeError:
+                pass
+        return False, self.raw
+    
+    @property
+    def type(self) -> str:
+        return 'json' if self._parsed[0] else 'string'
+    
+    @property
+    def data(self) -> Any:
+        return self._parsed[1]
+
+@functools.lru_cache(maxsize=128)
+def _load_png_cached(file_path: str, mtime_ns: int, size: int):
+    """Walk the PNG once; cached on (path, mtime, size) so edits invalidate it"""
+    header, keys, parameters_data = _read_png_text(file_path)
+    content = None if parameters_data is None else ParametersContent(parameters_data)
+    return header, keys, content
+
+def _load_png(file_path: str) -> Tuple[Dict[str, Any], List[str], Optional[ParametersContent]]:
+    """
+    Load a PNG's header, text chunk keywords and parameters once for all extractors
+    
+    Args:
+        file_path: Path to the PNG file
+        
+    Returns:
+        Tuple of (header dict with 'size' and 'mode', text chunk keywords,
+        ParametersContent or None if the PNG has no parameters chunk)
+    """
+    st = os.stat(file_path)
+    return _load_png_cached(file_path, st.st_mtime_ns, st.st_size)
 
 def extract_positive_prompt(file_path: str) -> Optional[str]:
     """
@@ -15,71 +190,46 @@ def extract_positive_prompt(file_path: str) -> Optional[str]:
         String containing the positive prompt or None if not found
     """
     try:
-        with Image.open(file_path) as img:
-            if img.format != 'PNG':
-                raise ValueError(f"File is not a PNG: {img.format}")
-            
-            metadata = img.info
-            
-            # Look specifically for parameters key
-            if 'parameters' not in metadata:
-                return None
-            
-            parameters_data = metadata['parameters']
+        # Look specifically for parameters key
+        content = _load_png(file_path)[2]
+        if content is None:
+            return None
+        parameters_data = content.raw
+        
+        # JSON parameters: look for positive prompt keys
+        parsed_params = content.data
+        if content.type == 'json' and isinstance(parsed_params, dict):
+            # First of the known positive prompt key names that is present
+            key = next((k for k in POSITIVE_KEYS if k in parsed_params), None)
+            if key is not None:
+                return parsed_params[key]
+        
+        # Parse as text format: find the first "Positive prompt:" line
+        match = _POSITIVE_LINE_RE.search(parameters_data)
+        if match:
+            prompt_text = match.group(1).strip()
             
-            # Try to parse as JSON first
-            try:
-                parsed_params = json.loads(parameters_data)
-                
-                # If it's a dictionary, look for positive prompt keys
-                if isinstance(parsed_params, dict):
-                    # Try various possible key names for positive prompt
-                    possible_keys = [
-                        'Positive prompt',
-                        'positive prompt', 
-                        'Positive Prompt',
-                        'positive_prompt',
-                        'prompt',
-                        'Prompt'
-                    ]
-                    
-                    for key in possible_keys:
-                        if key in parsed_params:
-                            return parsed_params[key]
+            # Check if the prompt continues on next lines
+            # (until we hit another parameter or empty line)
+            pos = match.end()
+            while True:
+                continuation = _NEXT_LINE_RE.match(parameters_data, pos)
+                if not continuation:
+                    break
+                next_line = continuation.group(1).strip()
                 
-            except json.JSONDecodeError:
-                # If not JSON, parse as text format
-                pass
-            
-            # Parse as text format
-            lines = parameters_data.split('\n')
-            
-            for i, line in enumerate(lines):
-                line = line.strip()
+                # Stop if we hit another parameter (contains :) or empty line
+                if ':' in next_line or not next_line:
+                    break
                 
-                # Look for "Positive prompt:" at the start of a line
-                if line.lower().startswith('positive prompt:'):
-                    # Extract everything after "Positive prompt:"
-                    prompt_text = line.split(':', 1)[1].strip()
-                    
-                    # Check if the prompt continues on next lines
-                    # (until we hit another parameter or empty line)
-                    j = i + 1
-                    while j < len(lines):
-                        next_line = lines[j].strip()
-                        
-                        # Stop if we hit another parameter (contains :) or empty line
-                        if ':' in next_line or not next_line:
-                            break
-                        
-                        # Add continuation line
-                        prompt_text += ' ' + next_line
-                        j += 1
-                    
-                    return prompt_text
-            
-            return None
+                # Add continuation line
+                prompt_text += ' ' + next_line
+                pos = continuation.end()
             
+            return prompt_text
+        
+        return None
+        
     except Exception as e:
         raise Exception(f"Error reading PNG file: {e}")
 
@@ -94,43 +244,92 @@ def extract_parameters_structure(file_path: str) -> Dict[str, Any]:
         Dictionary containing parameters structure
     """
     try:
-        with Image.open(file_path) as img:
-            metadata = img.info
-            result = {
-                'file_info': {
-                    'filename': os.path.basename(file_path),
-                    'size': img.size,
-                    'mode': img.mode
-                },
-                'parameters_found': False,
-                'parameters_content': None,
-                'all_keys': list(metadata.keys())
-            }
-            
-            # Look for parameters key
-            if 'parameters' in metadata:
-                result['parameters_found'] = True
-                parameters_data = metadata['parameters']
-                
-                try:
-                    # Try to parse as JSON
-                    parsed_data = json.loads(parameters_data)
-                    result['parameters_content'] = {
-                        'type': 'json',
-                        'data': parsed_data
-                    }
-                except json.JSONDecodeError:
-                    # Store as string
-                    result['parameters_content'] = {
-                        'type': 'string',
-                        'data': parameters_data
-                    }
-            
-            return result
-            
+        header, keys, content = _load_png(file_path)
+        result = {
+            'file_info': {
+                'filename': os.path.basename(file_path),
+                'size': header['size'],
+                'mode': header['mode']
+            },
+            'parameters_found': False,
+            'parameters_content': None,
+            'all_keys': keys
+        }
+        
+        # Look for parameters key
+        # JSON is parsed lazily, on first access to parameters_content.type/.data
+        if content is not None:
+            result['parameters_found'] = True
+            result['parameters_content'] = content
+        
+        return result
+        
     except Exception as e:
         raise Exception(f"Error reading PNG file: {e}")
 
+def _extract_one(file_path: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Worker for extract_positive_prompts; returns (file_path, prompt, error message)"""
+    try:
+        return file_path, extract_positive_prompt(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+def extract_positive_prompts(paths: Iterable[str], workers: Optional[int] = None,
+                             errors: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Extract the positive prompts of many PNG files in parallel
+    
+    Args:
+        paths: Paths to the PNG files
+        workers: Number of worker processes (defaults to the CPU count)
+        errors: Optional dict that receives {path: error message} for unreadable files
+        
+    Returns:
+        Dictionary mapping each path to its positive prompt (None if not found or unreadable)
+    """
+    paths = list(paths)
+    
+    # Small batches aren't worth the process pool start-up
+    if len(paths) < 4:
+        processed = map(_extract_one, paths)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        processed = executor.map(_extract_one, paths, chunksize=32)
+    
+    results = {}
+    try:
+        for file_path, prompt, error in processed:
+            results[file_path] = prompt
+            if error is not None and errors is not None:
+                errors[file_path] = error
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    return results
+
+def _iter_png_files(root: str):
+    """
+    Recursively yield the paths of PNG files below a directory
+    
+    Uses os.scandir so file/directory checks come from the cached directory
+    entries instead of an extra stat per file. Hidden entries are skipped.
+    """
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file() and entry.name.lower().endswith('.png'):
+                        yield entry.path
+        except OSError:
+            continue
+
 def save_positive_prompt(prompt: str, output_path: str):
     """Save positive prompt to text file"""
     try:
@@ -142,97 +341,162 @@ def save_positive_prompt(prompt: str, output_path: str):
 
 def print_extraction_results(file_path: str, positive_prompt: Optional[str]):
     """Print the extraction results"""
-    print("=" * 60)
-    print("PARAMETERS:POSITIVE PROMPT EXTRACTION")
-    print("=" * 60)
+    out = []
+    out.append(_BAR60)
+    out.append("PARAMETERS:POSITIVE PROMPT EXTRACTION")
+    out.append(_BAR60)
     
-    print(f"\nFile: {os.path.basename(file_path)}")
+    out.append(f"\nFile: {os.path.basename(file_path)}")
     
     if positive_prompt:
-        print(f"\n✓ Positive Prompt Found:")
-        print("-" * 40)
-        print(positive_prompt)
-        print("-" * 40)
-        print(f"\nPrompt Length: {len(positive_prompt)} characters")
+        out.append(f"\n✓ Positive Prompt Found:")
+        out.append(_BAR40)
+        out.append(positive_prompt)
+        out.append(_BAR40)
+        out.append(f"\nPrompt Length: {len(positive_prompt)} characters")
     else:
-        print("\n✗ No positive prompt found in parameters")
-        print("\nTip: Use --debug to see the parameters structure")
+        out.append("\n✗ No positive prompt found in parameters")
+        out.append("\nTip: Use --debug to see the parameters structure")
+    
+    # One write for the whole report instead of a print per line
+    sys.stdout.write('\n'.join(out) + '\n')
 
 def print_debug_info(file_path: str):
     """Print parameters structure for debugging"""
+    out = []
     try:
         params_info = extract_parameters_structure(file_path)
         
-        print("=" * 60)
-        print("DEBUG: PARAMETERS STRUCTURE ANALYSIS")
-        print("=" * 60)
+        out.append(_BAR60)
+        out.append("DEBUG: PARAMETERS STRUCTURE ANALYSIS")
+        out.append(_BAR60)
         
-        print(f"\nFile: {params_info['file_info']['filename']}")
-        print(f"Parameters found: {params_info['parameters_found']}")
+        out.append(f"\nFile: {params_info['file_info']['filename']}")
+        out.append(f"Parameters found: {params_info['parameters_found']}")
         
-        print(f"\nAll available metadata keys ({len(params_info['all_keys'])}):")
+        out.append(f"\nAll available metadata keys ({len(params_info['all_keys'])}):")
         for key in params_info['all_keys']:
-            print(f"  • {key}")
+            out.append(f"  • {key}")
         
         if params_info['parameters_found']:
-            print(f"\n✓ Parameters key found!")
+            out.append(f"\n✓ Parameters key found!")
             content = params_info['parameters_content']
-            print(f"Parameters data type: {content['type']}")
+            out.append(f"Parameters data type: {content.type}")
             
-            if content['type'] == 'json':
-                print("\nParameters JSON structure:")
-                print(json.dumps(content['data'], indent=2))
+            if content.type == 'json':
+                out.append("\nParameters JSON structure:")
+                if orjson is not None:
+                    out.append(orjson.dumps(content.data, option=orjson.OPT_INDENT_2).decode('utf-8'))
+                else:
+                    out.append(json.dumps(content.data, indent=2))
                 
                 # Analyze the structure
-                if isinstance(content['data'], dict):
-                    print(f"\nParameters contains {len(content['data'])} keys:")
-                    for key in content['data'].keys():
-                        print(f"  • {key}")
+                if isinstance(content.data, dict):
+                    out.append(f"\nParameters contains {len(content.data)} keys:")
+                    for key in content.data.keys():
+                        out.append(f"  • {key}")
                         if 'positive' in key.lower() or key.lower() == 'prompt':
-                            print(f"    ^ This looks like the positive prompt key!")
+                            out.append(f"    ^ This looks like the positive prompt key!")
             
             else:
-                print(f"\nParameters string content:")
-                print("-" * 40)
-                print(content['data'])
-                print("-" * 40)
+                out.append(f"\nParameters string content:")
+                out.append(_BAR40)
+                out.append(content.data)
+                out.append(_BAR40)
                 
                 # Analyze text structure
-                lines = content['data'].split('\n')
-                print(f"\nParameters contains {len(lines)} lines:")
+                lines = content.data.split('\n')
+                out.append(f"\nParameters contains {len(lines)} lines:")
                 for i, line in enumerate(lines[:10]):  # Show first 10 lines
                     line_preview = line.strip()
                     if len(line_preview) > 60:
                         line_preview = line_preview[:60] + "..."
-                    print(f"  {i+1}: {line_preview}")
+                    out.append(f"  {i+1}: {line_preview}")
                     if 'positive prompt' in line.lower():
-                        print(f"      ^ Line {i+1} contains 'positive prompt'!")
+                        out.append(f"      ^ Line {i+1} contains 'positive prompt'!")
                 
                 if len(lines) > 10:
-                    print(f"  ... and {len(lines) - 10} more lines")
+                    out.append(f"  ... and {len(lines) - 10} more lines")
         
         else:
-            print(f"\n✗ No 'parameters' key found in metadata")
+            out.append(f"\n✗ No 'parameters' key found in metadata")
     
     except Exception as e:
-        print(f"✗ Debug error: {e}")
+        out.append(f"✗ Debug error: {e}")
+    
+    sys.stdout.write('\n'.join(out) + '\n')
+
+def process_batch(paths):
+    """Extract and report prompts for directories, wildcard patterns or several files"""
+    # Dict keys dedupe while keeping discovery order
+    files = {}
+    for path_arg in paths:
+        if os.path.isdir(path_arg):
+            files.update(dict.fromkeys(_iter_png_files(path_arg)))
+        else:
+            for f in glob.iglob(path_arg, recursive=True):
+                if f.lower().endswith('.png') and os.path.isfile(f):
+                    files[f] = None
+    
+    if not files:
+        print("✗ No PNG files found matching the specified paths/patterns")
+        return
+    
+    if '--debug' in sys.argv:
+        for file_path in files:
+            print_debug_info(file_path)
+        return
+    
+    output_dir = None
+    if '--output' in sys.argv:
+        idx = sys.argv.index('--output')
+        if idx + 1 < len(sys.argv):
+            output_dir = sys.argv[idx + 1]
+            os.makedirs(output_dir, exist_ok=True)
+    
+    errors = {}
+    results = extract_positive_prompts(files, errors=errors)
+    
+    for file_path, positive_prompt in results.items():
+        if file_path in errors:
+            print(f"✗ Error processing {os.path.basename(file_path)}: {errors[file_path]}")
+            continue
+        
+        print_extraction_results(file_path, positive_prompt)
+        
+        if '--save' in sys.argv and positive_prompt:
+            base_name = os.path.splitext(file_path)[0]
+            if output_dir:
+                base_name = os.path.join(output_dir, os.path.basename(base_name))
+            save_positive_prompt(positive_prompt, f"{base_name}_positive_prompt.txt")
 
 def main():
     """Main function to handle command line usage"""
     if len(sys.argv) < 2:
         print("Parameters:Positive Prompt Extractor")
-        print("Usage: python prompt_extractor.py <png_file> [options]")
+        print("Usage: python prompt_extractor.py <png_file|dir|pattern...> [options]")
         print("\nOptions:")
         print("  --save         Save positive prompt to text file")
-        print("  --output <path> Specify output file path")
+        print("  --output <path> Specify output file path (output directory for several files)")
         print("  --debug        Show parameters structure for debugging")
         print("\nExamples:")
         print("  python prompt_extractor.py image.png")
         print("  python prompt_extractor.py image.png --save")
         print("  python prompt_extractor.py image.png --debug")
+        print("  python prompt_extractor.py /path/to/images/ --save")
+        return
+    
+    # Positional arguments, skipping the value that follows --output
+    args = sys.argv[1:]
+    paths = [arg for i, arg in enumerate(args)
+             if not arg.startswith('--') and (i == 0 or args[i - 1] != '--output')]
+    
+    # Several files, a directory or a wildcard pattern go through the batch path
+    if len(paths) != 1 or os.path.isdir(paths[0]) or glob.has_magic(paths[0]):
+        process_batch(paths)
         return
     
-    file_path = sys.argv[1]
+    file_path = paths[0]
     
     if not os.path.exists(file_path):
         print(f"✗ File not found: {file_path}")
@@ -1,12 +1,18 @@
+import io
 import json
+import mmap
+import multiprocessing
 import os
+import re
+import struct
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from PIL import Image, ImageTk
-import pyperclip
 from typing import Dict, Any, List, Optional
 import threading
-import glob
+from collections import OrderedDict
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # Try to import tkinterdnd2 for drag and drop
 try:
@@ -15,6 +21,472 @@ try:
 except ImportError:
     HAS_DND = False
 
+# Use orjson for the (often large) workflow JSON when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+_CHUNK_HEADER = struct.Struct('>I4s')
+
+# Node class name matched by every extractor path
+CLIP_TEXT_ENCODE = 'CLIPTextEncode'
+
+# Cheap pre-check on the raw workflow text: nodes only match if their type
+# contains "cliptext" (case-insensitive), so files without it skip the parse
+_CLIPTEXT_RE = re.compile(r'cliptext', re.I)
+
+# Title / prompt classifiers for workflow nodes ("pos" also covers "positive")
+_POS_TITLE_RE = re.compile(r'pos', re.I)
+_NEG_TITLE_RE = re.compile(r'neg', re.I)
+_UNTITLED_RE = re.compile(r'(?:untitled)?', re.I)
+_NEGATIVE_RE = re.compile(r'negative', re.I)
+_NEG_PREFIX_RE = re.compile(r'\s*negative', re.I)
+
+# "Positive prompt:" line of A1111-style parameters text, and the first later
+# line that ends the prompt block (it has a ':' and names another parameter)
+_POSITIVE_LINE_RE = re.compile(r'^[^\S\n]*positive prompt:(.*)$', re.I | re.M)
+_PARAM_LINE_RE = re.compile(
+    r'^(?=[^\n]*:)[^\n]*?(?:negative prompt|steps|sampler|cfg scale|seed|size|model|clip skip)',
+    re.I | re.M
+)
+
+# Extraction is mostly file I/O, so use more threads than cores
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Batches at least this large fan out over a process pool instead, so JSON
+# decoding and zlib work use every core; progress is reported every N files
+PROCESS_POOL_MIN_FILES = 64
+PROGRESS_EVERY = 32
+
+# Number of (path, mtime, mode) extraction results kept for re-runs
+RESULT_CACHE_SIZE = 2048
+
+# Prompts rendered right away; the rest are appended in chunks between frames
+EAGER_PROMPTS = 200
+RENDER_CHUNK_PROMPTS = 100
+RENDER_DELAY_MS = 16
+
+# Saved prompts file separators
+_BAR30 = "=" * 30
+_BAR20 = "-" * 20
+
+
+def _read_png_text_chunks(file_path: str):
+    """Return {keyword: text} for a PNG, or None so _read_png_meta can fall back to PIL"""
+    text_chunks = {}
+
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 8
+            end = len(mm)
+            while offset + 8 <= end:
+                length, ctype = _CHUNK_HEADER.unpack_from(mm, offset)
+                data_start = offset + 8
+                offset = data_start + length + 4  # Skip data + CRC
+
+                if ctype in (b'IDAT', b'IEND'):
+                    break
+
+                if ctype not in (b'tEXt', b'zTXt', b'iTXt'):
+                    continue
+
+                if data_start + length > end:
+                    break  # Truncated file
+                data = mm[data_start:data_start + length]
+
+                try:
+                    if ctype == b'tEXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        text_chunks[keyword.decode('latin-1')] = value.decode('latin-1')
+                    elif ctype == b'zTXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        # value[0] is the compression method (always zlib)
+                        text_chunks[keyword.decode('latin-1')] = zlib.decompress(value[1:]).decode('latin-1')
+                    else:
+                        keyword, _, rest = data.partition(b'\x00')
+                        compressed = rest[0]
+                        # Skip compression method, then language tag and translated keyword
+                        _language, _, rest = rest[2:].partition(b'\x00')
+                        _translated, _, value = rest.partition(b'\x00')
+                        if compressed:
+                            value = zlib.decompress(value)
+                        text_chunks[keyword.decode('latin-1')] = value.decode('utf-8')
+                except (IndexError, zlib.error, UnicodeDecodeError) as e:
+                    print(f"Warning: Skipping malformed {ctype.decode('latin-1')} chunk: {e}")
+
+    return text_chunks
+
+
+def _read_png_meta(file_path: str):
+    """Read the format and text metadata without decoding any pixel data"""
+    text_chunks = _read_png_text_chunks(file_path)
+    if text_chunks is not None:
+        return 'PNG', text_chunks
+
+    # Not a PNG stream; let PIL identify it so the caller can report the format
+    img = Image.open(file_path)
+    try:
+        return img.format, img.info
+    finally:
+        img.close()
+
+
+def _iter_png_files(root: str):
+    """
+    Recursively yield the paths of PNG files below a directory
+
+    Uses os.scandir so file/directory checks come from the cached directory
+    entries instead of an extra stat per file. Hidden entries are skipped,
+    matching the previous glob("**/*.png") behavior.
+    """
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name[-4:].lower() == '.png' and entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
+
+
+# --------------------------
+# Extraction (two independent paths)
+# --------------------------
+def extract_positive_prompts_comfyui(file_path: str) -> Dict[str, Any]:
+    """Extract positive prompts using ComfyUI metadata (workflow/prompt). Original behavior."""
+    try:
+        img_format, metadata = _read_png_meta(file_path)
+        if img_format != 'PNG':
+            raise ValueError(f"File is not a PNG: {img_format}")
+
+        result = {
+            'file_info': {
+                'filename': os.path.basename(file_path)
+            },
+            'positive_prompts': [],
+            'extraction_method': 'comfyui'
+        }
+
+        processed_nodes = set()
+
+        # Try workflow first
+        if 'workflow' in metadata and _CLIPTEXT_RE.search(metadata['workflow']):
+            try:
+                workflow_data = _loads(metadata['workflow'])
+                prompts = extract_positive_from_workflow(workflow_data, processed_nodes)
+                result['positive_prompts'].extend(prompts)
+            except json.JSONDecodeError as e:
+                print(f"Warning: Could not parse workflow JSON: {e}")
+
+        # Then prompt data if none found
+        if (not result['positive_prompts'] and 'prompt' in metadata
+                and CLIP_TEXT_ENCODE in metadata['prompt']):
+            try:
+                prompt_data = _loads(metadata['prompt'])
+                prompts = extract_positive_from_prompt_data(prompt_data, processed_nodes)
+                result['positive_prompts'].extend(prompts)
+            except json.JSONDecodeError as e:
+                print(f"Warning: Could not parse prompt JSON: {e}")
+
+        return result
+
+    except Exception as e:
+        raise Exception(f"Error reading PNG file: {e}")
+
+
+def extract_positive_prompts_parameters(file_path: str) -> Dict[str, Any]:
+    """Extract positive prompt using Parameters metadata and direct PNG properties."""
+    try:
+        img_format, metadata = _read_png_meta(file_path)
+        if img_format != 'PNG':
+            raise ValueError(f"File is not a PNG: {img_format}")
+
+        result = {
+            'file_info': {
+                'filename': os.path.basename(file_path)
+            },
+            'positive_prompts': [],
+            'extraction_method': 'parameters'
+        }
+
+        # First, try the ORIGINAL parameters extraction
+        prompt_text = extract_positive_from_parameters_strict(metadata)
+        if prompt_text:
+            result['positive_prompts'].append({
+                'text': prompt_text,
+                'node_id': 'parameters',
+                'node_type': 'parameters',
+                'title': 'Parameters',
+                'source': 'parameters'
+            })
+        else:
+            # If original method fails, try PNG properties as fallback
+            prompt_text = extract_positive_from_png_properties(metadata)
+            if prompt_text:
+                result['positive_prompts'].append({
+                    'text': prompt_text,
+                    'node_id': 'png_properties',
+                    'node_type': 'png_properties',
+                    'title': 'PNG Properties',
+                    'source': 'png_properties'
+                })
+
+        return result
+
+    except Exception as e:
+        raise Exception(f"Error reading PNG file: {e}")
+
+
+def extract_positive_from_workflow(workflow_data: Dict, processed_nodes: set) -> List[Dict]:
+    """Extract positive prompts from workflow nodes"""
+    positive_prompts = []
+
+    nodes = workflow_data.get('nodes', [])
+
+    # Local aliases for the unbound/bound methods used per node in the loops below
+    _get = dict.get
+    processed_add = processed_nodes.add
+    prompts_append = positive_prompts.append
+
+    # One pass over the nodes, keeping only CLIPTextEncode-like nodes with a
+    # widget value, as parallel lists of the fields classified below
+    ids, types, titles, texts = [], [], [], []
+    for node in nodes:
+        node_type = _get(node, 'type', '')
+        if (_CLIPTEXT_RE.search(node_type) or
+                _get(node, 'properties', {}).get('Node name for S&R') == CLIP_TEXT_ENCODE):
+            widgets_values = _get(node, 'widgets_values', [])
+            if widgets_values:
+                ids.append(_get(node, 'id'))
+                types.append(node_type)
+                titles.append(_get(node, 'title'))
+                texts.append(widgets_values[0])
+
+    for node_id, node_type, raw_title, prompt_text in zip(ids, types, titles, texts):
+        # Skip if already processed
+        if node_id in processed_nodes:
+            continue
+
+        title = '' if raw_title is None else raw_title
+
+        # Only include if it's likely a positive prompt
+        is_positive = bool(
+            _POS_TITLE_RE.search(title) or
+            (_UNTITLED_RE.fullmatch(title) and isinstance(prompt_text, str) and prompt_text.strip() != '' and not _NEGATIVE_RE.search(prompt_text, 0, 50))
+        )
+
+        # Exclude obvious negative prompts
+        is_negative = bool(
+            _NEG_TITLE_RE.search(title) or
+            (isinstance(prompt_text, str) and (prompt_text.strip() == '' or _NEG_PREFIX_RE.match(prompt_text)))
+        )
+
+        if isinstance(prompt_text, list):
+            # Handle rare list case by joining
+            prompt_text = '\n'.join(map(str, prompt_text))
+
+        if is_positive and not is_negative and isinstance(prompt_text, (str, int, float)):
+            prompt_info = {
+                'text': str(prompt_text),
+                'node_id': node_id,
+                'node_type': node_type,
+                'title': 'Untitled' if raw_title is None else raw_title,
+                'source': 'workflow'
+            }
+
+            prompts_append(prompt_info)
+            processed_add(node_id)
+
+    return positive_prompts
+
+
+def extract_positive_from_prompt_data(prompt_data: Dict, processed_nodes: set) -> List[Dict]:
+    """Extract positive prompts from prompt data structure"""
+    positive_prompts = []
+    _get = dict.get
+    processed_add = processed_nodes.add
+    prompts_append = positive_prompts.append
+
+    for key, value in prompt_data.items():
+        if isinstance(value, dict):
+            class_type = _get(value, 'class_type', '')
+
+            # Skip if already processed
+            if key in processed_nodes:
+                continue
+
+            if class_type == CLIP_TEXT_ENCODE:
+                inputs = _get(value, 'inputs', {})
+
+                # Look for text input
+                text_content = None
+                if 'text' in inputs:
+                    text_content = inputs['text']
+                elif 'prompt' in inputs:
+                    text_content = inputs['prompt']
+
+                # Normalize to string
+                if text_content is None:
+                    continue
+                if isinstance(text_content, list):
+                    text_content = '\n'.join(map(str, text_content))
+                elif not isinstance(text_content, str):
+                    text_content = str(text_content)
+
+                if text_content.strip():
+                    # Only include if it looks like a positive prompt
+                    is_negative = (
+                        'negative' in text_content.lower()[:50]
+                    )
+
+                    if not is_negative:
+                        prompt_info = {
+                            'text': text_content,
+                            'node_id': key,
+                            'class_type': class_type,
+                            'title': f"Node {key}",
+                            'source': 'prompt_data'
+                        }
+
+                        prompts_append(prompt_info)
+                        processed_add(key)
+
+    return positive_prompts
+
+
+def extract_positive_from_png_properties(metadata: Dict) -> Optional[str]:
+    """Extract positive prompt directly from PNG properties like 'Positive prompt:'"""
+    try:
+        # Look for direct positive prompt properties
+        possible_keys = [
+            'Positive prompt',
+            'positive prompt', 
+            'Positive Prompt',
+            'positive_prompt'
+        ]
+
+        for key in possible_keys:
+            if key in metadata:
+                value = metadata[key]
+
+                # Handle different data types
+                if isinstance(value, bytes):
+                    try:
+                        value = value.decode('utf-8', errors='ignore')
+                    except Exception:
+                        value = str(value)
+                elif not isinstance(value, str):
+                    value = str(value)
+
+                # Clean and return if not empty
+                if value and value.strip():
+                    result = value.strip()
+                    # Remove surrounding quotes if present
+                    if ((result.startswith('"') and result.endswith('"')) or 
+                        (result.startswith("'") and result.endswith("'"))):
+                        result = result[1:-1]
+                    return result
+
+        return None
+
+    except Exception as e:
+        print(f"PNG properties extractor error: {e}")
+        return None
+
+
+def extract_positive_from_parameters_strict(metadata: Dict) -> Optional[str]:
+    """Exact-style extractor from the second code, with robust type handling to avoid .strip on list."""
+    try:
+        if 'parameters' not in metadata:
+            return None
+
+        parameters_data = metadata['parameters']
+
+        # Ensure we are working with a string
+        if isinstance(parameters_data, bytes):
+            try:
+                parameters_data = parameters_data.decode('utf-8', errors='ignore')
+            except Exception:
+                parameters_data = str(parameters_data)
+        elif isinstance(parameters_data, (list, dict)):
+            # Convert to JSON string to avoid calling .strip on non-strings
+            parameters_data = json.dumps(parameters_data, ensure_ascii=False)
+        elif not isinstance(parameters_data, str):
+            parameters_data = str(parameters_data)
+
+        # Try JSON first
+        try:
+            parsed_params = _loads(parameters_data)
+            if isinstance(parsed_params, dict):
+                possible_keys = [
+                    'Positive prompt',
+                    'positive prompt',
+                    'Positive Prompt',
+                    'positive_prompt',
+                    'prompt',
+                    'Prompt'
+                ]
+                for key in possible_keys:
+                    if key in parsed_params:
+                        value = parsed_params[key]
+                        if isinstance(value, list):
+                            return '\n'.join(map(str, value))
+                        return str(value) if value is not None else None
+        except json.JSONDecodeError:
+            pass
+
+        # Parse text format: find the first "Positive prompt:" line, then
+        # take the following lines up to the first one naming another parameter
+        match = _POSITIVE_LINE_RE.search(parameters_data)
+        if match:
+            prompt_text = match.group(1).strip()
+            prompt_lines = [prompt_text] if prompt_text else []
+            block_start = match.end() + 1  # Past the newline ending the match
+            if block_start <= len(parameters_data):
+                stop = _PARAM_LINE_RE.search(parameters_data, block_start)
+                if stop is None:
+                    block = parameters_data[block_start:]
+                elif stop.start() > block_start:
+                    block = parameters_data[block_start:stop.start() - 1]
+                else:
+                    block = None  # The very next line is already a parameter
+                if block is not None:
+                    prompt_lines.extend(line.rstrip() for line in block.split('\n'))
+
+            full_prompt = '\n'.join(prompt_lines).rstrip()
+            # Trim leading blank lines
+            out_lines = full_prompt.splitlines()
+            k = 0
+            while k < len(out_lines) and out_lines[k].strip() == '':
+                k += 1
+            return '\n'.join(out_lines[k:]) if k < len(out_lines) else None
+
+        return None
+
+    except Exception as e:
+        print(f"Parameters extractor error: {e}")
+        return None
+
+
+def _extract_one(file_path: str, mode: str) -> Dict[str, Any]:
+    """Run the extractor for the given mode on a single file (picklable, for the process pool)"""
+    if mode == "ComfyUI":
+        return extract_positive_prompts_comfyui(file_path)
+    return extract_positive_prompts_parameters(file_path)
+
 
 class ComfyUIPromptExtractorUI:
     def __init__(self, root):
@@ -29,15 +501,40 @@ class ComfyUIPromptExtractorUI:
         self.all_prompt_texts = []
         self.thumbnail_image = None  # Store thumbnail reference
 
+        # LRU of extraction results keyed on (path, mtime_ns, mode), so toggling
+        # the mode back and forth (Ctrl+E) does not re-read unchanged files
+        self._result_cache = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+
+        # Pending after() job that appends the next chunk of the prompts view
+        self._render_job = None
+
+        # Created on the first large batch and reused afterwards
+        self._process_pool = None
+
+        # '\n\n'.join(self.all_prompt_texts), built on the first copy of a result set
+        self._joined_prompts = None
+
         # Configure style
         style = ttk.Style()
         style.theme_use('clam')
 
         self.setup_ui()
 
+        # Drop queued jobs when the window closes. This has to happen here rather
+        # than in an atexit hook: concurrent.futures joins its workers first
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Keyboard shortcuts
         self.root.bind_all("<Control-e>", self.toggle_mode_and_rerun)
 
+    def on_close(self):
+        """Cancel queued process-pool jobs and close the window"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        self.root.destroy()
+
     def setup_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -205,15 +702,18 @@ class ComfyUIPromptExtractorUI:
         self.clear_btn = ttk.Button(btn_frame, text="Clear", command=self.clear_results)
         self.clear_btn.grid(row=0, column=3)
 
-        # Progress bar (hidden by default)
+        # Progress bar (stays in the layout; only animated while working)
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 5))
-        self.progress.grid_remove()  # Hide initially
 
     def create_thumbnail(self, image_path, max_size=(240, 240)):
         """Create a thumbnail from the image file"""
         try:
             with Image.open(image_path) as img:
+                # Read the size before thumbnail() shrinks the image in place,
+                # rather than opening the file a second time
+                original_size = img.size
+                
                 # Create thumbnail
                 img.thumbnail(max_size, Image.Resampling.LANCZOS)
                 
@@ -221,7 +721,6 @@ class ComfyUIPromptExtractorUI:
                 photo = ImageTk.PhotoImage(img)
                 
                 # Get image info
-                original_size = Image.open(image_path).size
                 info_text = f"{original_size[0]}×{original_size[1]}\n{os.path.basename(image_path)}"
                 
                 return photo, info_text
@@ -257,7 +756,6 @@ class ComfyUIPromptExtractorUI:
         # Rerun on same files if any
         if self.current_files:
             self.status_var.set(f"Re-running in {new_mode} mode...")
-            self.progress.grid()
             self.progress.start()
             self.browse_file_btn.configure(state='disabled')
             self.browse_folder_btn.configure(state='disabled')
@@ -300,20 +798,20 @@ class ComfyUIPromptExtractorUI:
     def browse_folder(self):
         folder_path = filedialog.askdirectory(title="Select Folder with ComfyUI PNG Files")
         if folder_path:
-            png_files = glob.glob(os.path.join(folder_path, "**", "*.png"), recursive=True)
+            png_files = list(_iter_png_files(folder_path))
             if png_files:
                 self.load_files(png_files)
             else:
                 messagebox.showinfo("No Files", "No PNG files found in the selected folder.")
 
     def load_files(self, file_paths):
-        # Filter for PNG files and existing files
+        # Filter for PNG files and existing files (lower-case only the
+        # extension, and check it before touching the filesystem)
         valid_files = []
         for file_path in file_paths:
             if os.path.isdir(file_path):
-                png_files = glob.glob(os.path.join(file_path, "**", "*.png"), recursive=True)
-                valid_files.extend(png_files)
-            elif os.path.exists(file_path) and file_path.lower().endswith('.png'):
+                valid_files.extend(_iter_png_files(file_path))
+            elif file_path[-4:].lower() == '.png' and os.path.exists(file_path):
                 valid_files.append(file_path)
 
         if not valid_files:
@@ -332,7 +830,6 @@ class ComfyUIPromptExtractorUI:
 
         self.current_files = valid_files
         self.status_var.set("Processing...")
-        self.progress.grid()
         self.progress.start()
 
         # Disable buttons during processing
@@ -351,331 +848,61 @@ class ComfyUIPromptExtractorUI:
     def extract_prompts_thread(self, file_paths, mode):
         """Extract prompts in separate thread"""
         try:
-            results = []
-            for file_path in file_paths:
-                if mode == "ComfyUI":
-                    result = self.extract_positive_prompts_comfyui(file_path)
-                else:
-                    result = self.extract_positive_prompts_parameters(file_path)
-                results.append(result)
+            keys = [(p, os.stat(p).st_mtime_ns, mode) for p in file_paths]
+            with self._result_cache_lock:
+                results = [self._result_cache.get(key) for key in keys]
+            missing = [file_paths[i] for i, result in enumerate(results) if result is None]
+
+            if len(missing) >= PROCESS_POOL_MIN_FILES:
+                extracted = self._extract_in_processes(missing, mode)
+            elif len(missing) > 1:
+                with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(missing))) as executor:
+                    extracted = list(executor.map(lambda p: _extract_one(p, mode), missing))
+            else:
+                extracted = [_extract_one(p, mode) for p in missing]
+
+            extracted = iter(extracted)
+            with self._result_cache_lock:
+                cache = self._result_cache
+                for i, key in enumerate(keys):
+                    if results[i] is None:
+                        results[i] = next(extracted)
+                    cache[key] = results[i]
+                    cache.move_to_end(key)
+                while len(cache) > RESULT_CACHE_SIZE:
+                    cache.popitem(last=False)
 
             # Update UI in main thread
             self.root.after(0, self.update_results, results, file_paths)
         except Exception as e:
             self.root.after(0, self.show_error, str(e))
 
-    # --------------------------
-    # Extraction (two independent paths)
-    # --------------------------
-    def extract_positive_prompts_comfyui(self, file_path: str) -> Dict[str, Any]:
-        """Extract positive prompts using ComfyUI metadata (workflow/prompt). Original behavior."""
-        try:
-            with Image.open(file_path) as img:
-                if img.format != 'PNG':
-                    raise ValueError(f"File is not a PNG: {img.format}")
-
-                metadata = img.info
-                result = {
-                    'file_info': {
-                        'filename': os.path.basename(file_path),
-                        'size': img.size,
-                        'mode': img.mode
-                    },
-                    'positive_prompts': [],
-                    'extraction_method': 'comfyui'
-                }
-
-                processed_nodes = set()
-
-                # Try workflow first
-                if 'workflow' in metadata:
-                    try:
-                        workflow_data = json.loads(metadata['workflow'])
-                        prompts = self.extract_positive_from_workflow(workflow_data, processed_nodes)
-                        result['positive_prompts'].extend(prompts)
-                    except json.JSONDecodeError as e:
-                        print(f"Warning: Could not parse workflow JSON: {e}")
-
-                # Then prompt data if none found
-                if not result['positive_prompts'] and 'prompt' in metadata:
-                    try:
-                        prompt_data = json.loads(metadata['prompt'])
-                        prompts = self.extract_positive_from_prompt_data(prompt_data, processed_nodes)
-                        result['positive_prompts'].extend(prompts)
-                    except json.JSONDecodeError as e:
-                        print(f"Warning: Could not parse prompt JSON: {e}")
-
-                return result
-
-        except Exception as e:
-            raise Exception(f"Error reading PNG file: {e}")
-
-    def extract_positive_prompts_parameters(self, file_path: str) -> Dict[str, Any]:
-        """Extract positive prompt using Parameters metadata and direct PNG properties."""
-        try:
-            with Image.open(file_path) as img:
-                if img.format != 'PNG':
-                    raise ValueError(f"File is not a PNG: {img.format}")
-
-                metadata = img.info
-                result = {
-                    'file_info': {
-                        'filename': os.path.basename(file_path),
-                        'size': img.size,
-                        'mode': img.mode
-                    },
-                    'positive_prompts': [],
-                    'extraction_method': 'parameters'
-                }
-
-                # First, try the ORIGINAL parameters extraction
-                prompt_text = self.extract_positive_from_parameters_strict(metadata)
-                if prompt_text:
-                    result['positive_prompts'].append({
-                        'text': prompt_text,
-                        'node_id': 'parameters',
-                        'node_type': 'parameters',
-                        'title': 'Parameters',
-                        'source': 'parameters'
-                    })
-                else:
-                    # If original method fails, try PNG properties as fallback
-                    prompt_text = self.extract_positive_from_png_properties(metadata)
-                    if prompt_text:
-                        result['positive_prompts'].append({
-                            'text': prompt_text,
-                            'node_id': 'png_properties',
-                            'node_type': 'png_properties',
-                            'title': 'PNG Properties',
-                            'source': 'png_properties'
-                        })
-
-                return result
-
-        except Exception as e:
-            raise Exception(f"Error reading PNG file: {e}")
-
-
-    def extract_positive_from_workflow(self, workflow_data: Dict, processed_nodes: set) -> List[Dict]:
-        """Extract positive prompts from workflow nodes"""
-        positive_prompts = []
-
-        nodes = workflow_data.get('nodes', [])
-
-        for node in nodes:
-            node_id = node.get('id')
-            node_type = node.get('type', '')
-            title = node.get('title', '').lower()
-
-            # Skip if already processed
-            if node_id in processed_nodes:
-                continue
-
-            # Look for CLIPTextEncode nodes
-            if (node_type == 'CLIPTextEncode' or
-                'cliptext' in node_type.lower() or
-                node.get('properties', {}).get('Node name for S&R') == 'CLIPTextEncode'):
-
-                widgets_values = node.get('widgets_values', [])
-
-                if widgets_values and len(widgets_values) > 0:
-                    prompt_text = widgets_values[0]
-
-                    # Only include if it's likely a positive prompt
-                    is_positive = (
-                        'positive' in title or
-                        'pos' in title or
-                        (title == '' and isinstance(prompt_text, str) and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50]) or
-                        (title == 'untitled' and isinstance(prompt_text, str) and prompt_text.strip() != '' and 'negative' not in prompt_text.lower()[:50])
-                    )
-
-                    # Exclude obvious negative prompts
-                    is_negative = (
-                        'negative' in title or
-                        'neg' in title or
-                        (isinstance(prompt_text, str) and (prompt_text.strip() == '' or prompt_text.lower().strip().startswith('negative')))
-                    )
-
-                    if isinstance(prompt_text, list):
-                        # Handle rare list case by joining
-                        prompt_text = '\n'.join(str(x) for x in prompt_text)
-
-                    if is_positive and not is_negative and isinstance(prompt_text, (str, int, float)):
-                        prompt_info = {
-                            'text': str(prompt_text),
-                            'node_id': node_id,
-                            'node_type': node_type,
-                            'title': node.get('title', 'Untitled'),
-                            'source': 'workflow'
-                        }
-
-                        positive_prompts.append(prompt_info)
-                        processed_nodes.add(node_id)
-
-        return positive_prompts
-
-    def extract_positive_from_prompt_data(self, prompt_data: Dict, processed_nodes: set) -> List[Dict]:
-        """Extract positive prompts from prompt data structure"""
-        positive_prompts = []
-
-        for key, value in prompt_data.items():
-            if isinstance(value, dict):
-                class_type = value.get('class_type', '')
-
-                # Skip if already processed
-                if key in processed_nodes:
-                    continue
-
-                if class_type == 'CLIPTextEncode':
-                    inputs = value.get('inputs', {})
-
-                    # Look for text input
-                    text_content = None
-                    if 'text' in inputs:
-                        text_content = inputs['text']
-                    elif 'prompt' in inputs:
-                        text_content = inputs['prompt']
-
-                    # Normalize to string
-                    if text_content is None:
-                        continue
-                    if isinstance(text_content, list):
-                        text_content = '\n'.join(str(i) for i in text_content)
-                    elif not isinstance(text_content, str):
-                        text_content = str(text_content)
-
-                    if text_content.strip():
-                        # Only include if it looks like a positive prompt
-                        is_negative = (
-                            'negative' in text_content.lower()[:50]
-                        )
-
-                        if not is_negative:
-                            prompt_info = {
-                                'text': text_content,
-                                'node_id': key,
-                                'class_type': class_type,
-                                'title': f"Node {key}",
-                                'source': 'prompt_data'
-                            }
-
-                            positive_prompts.append(prompt_info)
-                            processed_nodes.add(key)
-
-        return positive_prompts
-    
-
-    def extract_positive_from_png_properties(self, metadata: Dict) -> Optional[str]:
-        """Extract positive prompt directly from PNG properties like 'Positive prompt:'"""
-        try:
-            # Look for direct positive prompt properties
-            possible_keys = [
-                'Positive prompt',
-                'positive prompt', 
-                'Positive Prompt',
-                'positive_prompt'
-            ]
-            
-            for key in possible_keys:
-                if key in metadata:
-                    value = metadata[key]
-                    
-                    # Handle different data types
-                    if isinstance(value, bytes):
-                        try:
-                            value = value.decode('utf-8', errors='ignore')
-                        except Exception:
-                            value = str(value)
-                    elif not isinstance(value, str):
-                        value = str(value)
-                    
-                    # Clean and return if not empty
-                    if value and value.strip():
-                        result = value.strip()
-                        # Remove surrounding quotes if present
-                        if ((result.startswith('"') and result.endswith('"')) or 
-                            (result.startswith("'") and result.endswith("'"))):
-                            result = result[1:-1]
-                        return result
-            
-            return None
-            
-        except Exception as e:
-            print(f"PNG properties extractor error: {e}")
-            return None
-
-
-    def extract_positive_from_parameters_strict(self, metadata: Dict) -> Optional[str]:
-        """Exact-style extractor from the second code, with robust type handling to avoid .strip on list."""
+    def _get_process_pool(self):
+        """Return the shared process pool, creating it on first use"""
+        if self._process_pool is None:
+            # Spawn rather than fork: this process already runs Tk and worker threads
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._process_pool
+
+    def _extract_in_processes(self, file_paths, mode):
+        """Extract a large batch in worker processes, posting progress as files complete"""
+        pool = self._get_process_pool()
+        futures = {pool.submit(_extract_one, path, mode): i for i, path in enumerate(file_paths)}
+        extracted = [None] * len(file_paths)
+        total = len(file_paths)
         try:
-            if 'parameters' not in metadata:
-                return None
-
-            parameters_data = metadata['parameters']
-
-            # Ensure we are working with a string
-            if isinstance(parameters_data, bytes):
-                try:
-                    parameters_data = parameters_data.decode('utf-8', errors='ignore')
-                except Exception:
-                    parameters_data = str(parameters_data)
-            elif isinstance(parameters_data, (list, dict)):
-                # Convert to JSON string to avoid calling .strip on non-strings
-                parameters_data = json.dumps(parameters_data, ensure_ascii=False)
-            elif not isinstance(parameters_data, str):
-                parameters_data = str(parameters_data)
-
-            # Try JSON first
-            try:
-                parsed_params = json.loads(parameters_data)
-                if isinstance(parsed_params, dict):
-                    possible_keys = [
-                        'Positive prompt',
-                        'positive prompt',
-                        'Positive Prompt',
-                        'positive_prompt',
-                        'prompt',
-                        'Prompt'
-                    ]
-                    for key in possible_keys:
-                        if key in parsed_params:
-                            value = parsed_params[key]
-                            if isinstance(value, list):
-                                return '\n'.join(str(v) for v in value)
-                            return str(value) if value is not None else None
-            except json.JSONDecodeError:
-                pass
-
-            # Parse text format
-            lines = parameters_data.split('\n')
-            for i, line in enumerate(lines):
-                line_stripped_lower = line.strip().lower()
-                if line_stripped_lower.startswith('positive prompt:'):
-                    prompt_text = line.split(':', 1)[1].strip() if ':' in line else ''
-                    j = i + 1
-                    prompt_lines = [prompt_text] if prompt_text else []
-                    while j < len(lines):
-                        next_line = lines[j]
-                        nl = next_line.strip().lower()
-                        if ':' in nl and any(param in nl for param in
-                                             ['negative prompt', 'steps', 'sampler', 'cfg scale', 'seed', 'size', 'model', 'clip skip']):
-                            break
-                        prompt_lines.append(next_line.rstrip())
-                        j += 1
-
-                    full_prompt = '\n'.join(prompt_lines).rstrip()
-                    # Trim leading blank lines
-                    out_lines = full_prompt.splitlines()
-                    k = 0
-                    while k < len(out_lines) and out_lines[k].strip() == '':
-                        k += 1
-                    return '\n'.join(out_lines[k:]) if k < len(out_lines) else None
-
-            return None
-
-        except Exception as e:
-            print(f"Parameters extractor error: {e}")
-            return None
+            for done, future in enumerate(as_completed(futures), 1):
+                extracted[futures[future]] = future.result()
+                if done % PROGRESS_EVERY == 0 or done == total:
+                    self.root.after(0, self.status_var.set, f"Processing... {done}/{total} files")
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        return extracted
 
     # --------------------------
     # UI update / actions
@@ -683,7 +910,6 @@ class ComfyUIPromptExtractorUI:
     def update_results(self, results, file_paths):
         # Stop progress bar
         self.progress.stop()
-        self.progress.grid_remove()
 
         # Re-enable buttons
         self.browse_file_btn.configure(state='normal')
@@ -693,14 +919,20 @@ class ComfyUIPromptExtractorUI:
         self.current_results = results
         self.current_files = file_paths
 
-        # Clear previous content
-        self.prompt_text.delete(1.0, tk.END)
-        self.summary_text.delete(1.0, tk.END)
+        # Stop appending the previous results; their content is replaced below
+        self._cancel_render()
 
         total_prompts = 0
         files_with_prompts = 0
         all_prompt_texts = []
 
+        # Build the text in memory; the prompts view is cut into
+        # (text, prompts shown so far) chunks so large batches render lazily
+        prompt_buf = io.StringIO()
+        summary_buf = io.StringIO()
+        prompt_chunks = []
+        next_cut = EAGER_PROMPTS
+
         # Process results
         for i, result in enumerate(results):
             file_info = result.get('file_info', {})
@@ -713,30 +945,35 @@ class ComfyUIPromptExtractorUI:
 
                 # Add to main prompts display
                 if len(results) > 1:
-                    self.prompt_text.insert(tk.END, f"=== {file_info.get('filename', 'Unknown')} [{method}] ===\n")
+                    prompt_buf.write(f"=== {file_info.get('filename', 'Unknown')} [{method}] ===\n")
 
                 for j, prompt_info in enumerate(positive_prompts, 1):
                     if len(positive_prompts) > 1:
-                        self.prompt_text.insert(tk.END, f"\nPrompt {j} - {prompt_info.get('title', 'Untitled')}:\n")
-                        self.prompt_text.insert(tk.END, "-" * 40 + "\n")
+                        prompt_buf.write(f"\nPrompt {j} - {prompt_info.get('title', 'Untitled')}:\n")
+                        prompt_buf.write("-" * 40 + "\n")
 
                     prompt_text = prompt_info['text']
-                    self.prompt_text.insert(tk.END, f"{prompt_text}\n")
+                    prompt_buf.write(f"{prompt_text}\n")
                     all_prompt_texts.append(prompt_text)
 
                     if j < len(positive_prompts):
-                        self.prompt_text.insert(tk.END, "\n")
+                        prompt_buf.write("\n")
+
+                    if len(all_prompt_texts) == next_cut:
+                        prompt_chunks.append((prompt_buf.getvalue(), next_cut))
+                        prompt_buf = io.StringIO()
+                        next_cut += RENDER_CHUNK_PROMPTS
 
                 if i < len(results) - 1:
-                    self.prompt_text.insert(tk.END, "\n" + "=" * 60 + "\n\n")
+                    prompt_buf.write("\n" + "=" * 60 + "\n\n")
 
         # Update summary
-        self.summary_text.insert(tk.END, f"EXTRACTION SUMMARY\n")
-        self.summary_text.insert(tk.END, f"=" * 50 + "\n\n")
-        self.summary_text.insert(tk.END, f"Extractor mode: {self.extractor_mode.get()}\n")
-        self.summary_text.insert(tk.END, f"Files processed: {len(results)}\n")
-        self.summary_text.insert(tk.END, f"Files with prompts: {files_with_prompts}\n")
-        self.summary_text.insert(tk.END, f"Total positive prompts found: {total_prompts}\n\n")
+        summary_buf.write(f"EXTRACTION SUMMARY\n")
+        summary_buf.write(f"=" * 50 + "\n\n")
+        summary_buf.write(f"Extractor mode: {self.extractor_mode.get()}\n")
+        summary_buf.write(f"Files processed: {len(results)}\n")
+        summary_buf.write(f"Files with prompts: {files_with_prompts}\n")
+        summary_buf.write(f"Total positive prompts found: {total_prompts}\n\n")
 
         if files_with_prompts == 0:
             msg = "No positive prompts found in any files.\n"
@@ -744,45 +981,86 @@ class ComfyUIPromptExtractorUI:
                 msg += "Make sure the PNG files contain ComfyUI workflow/prompt metadata, or switch to 'Parameters' mode (Ctrl+E)."
             else:
                 msg += "Make sure the PNG files contain 'parameters' metadata or switch to 'ComfyUI' mode (Ctrl+E)."
-            self.summary_text.insert(tk.END, msg)
+            summary_buf.write(msg)
         else:
-            self.summary_text.insert(tk.END, "FILES WITH PROMPTS:\n")
-            self.summary_text.insert(tk.END, "-" * 30 + "\n")
+            summary_buf.write("FILES WITH PROMPTS:\n")
+            summary_buf.write("-" * 30 + "\n")
 
             for result in results:
                 positive_prompts = result.get('positive_prompts', [])
                 method = result.get('extraction_method', 'unknown')
                 if positive_prompts:
                     filename = result.get('file_info', {}).get('filename', 'Unknown')
-                    self.summary_text.insert(tk.END, f"• {filename} ({len(positive_prompts)} prompts) [{method}]\n")
+                    summary_buf.write(f"• {filename} ({len(positive_prompts)} prompts) [{method}]\n")
+
+        if prompt_buf.tell() or not prompt_chunks:
+            prompt_chunks.append((prompt_buf.getvalue(), total_prompts))
+        first_text, shown = prompt_chunks[0]
+        # Swap the old content for the new in a single Tk call per widget
+        self.prompt_text.replace(1.0, tk.END, first_text)
+        self.summary_text.replace(1.0, tk.END, summary_buf.getvalue())
 
         # Update status and enable buttons
         if total_prompts > 0:
-            self.status_var.set(f"✓ Extracted {total_prompts} positive prompts from {files_with_prompts} files")
+            done_status = f"✓ Extracted {total_prompts} positive prompts from {files_with_prompts} files"
+            if len(prompt_chunks) > 1:
+                self.status_var.set(f"Showing {shown} of {total_prompts} prompts...")
+                self._render_job = self.root.after(RENDER_DELAY_MS, self._append_next_chunk,
+                                                   iter(prompt_chunks[1:]), total_prompts, done_status)
+            else:
+                self.status_var.set(done_status)
             self.copy_btn.configure(state='normal')
             self.copy_first_btn.configure(state='normal')
             self.save_btn.configure(state='normal')
 
             # Store all prompts for copying
             self.all_prompt_texts = all_prompt_texts
+            self._joined_prompts = None
         else:
             self.status_var.set("✗ No positive prompts found")
             self.all_prompt_texts = []
+            self._joined_prompts = None
+
+    def _append_next_chunk(self, pending, total_prompts, done_status):
+        """Append the next chunk of the prompts view and schedule the one after it"""
+        chunk = next(pending, None)
+        if chunk is None:
+            self._render_job = None
+            self.status_var.set(done_status)
+            return
+
+        text, shown = chunk
+        self.prompt_text.insert(tk.END, text)
+        self.status_var.set(f"Showing {shown} of {total_prompts} prompts...")
+        self._render_job = self.root.after(RENDER_DELAY_MS, self._append_next_chunk,
+                                           pending, total_prompts, done_status)
+
+    def _cancel_render(self):
+        """Stop appending a previous result set to the prompts view"""
+        if self._render_job is not None:
+            self.root.after_cancel(self._render_job)
+            self._render_job = None
 
     def show_error(self, error_message):
         self.progress.stop()
-        self.progress.grid_remove()
         self.browse_file_btn.configure(state='normal')
         self.browse_folder_btn.configure(state='normal')
 
         self.status_var.set(f"✗ Error: {error_message}")
         messagebox.showerror("Error", f"Failed to process file(s):\n{error_message}")
 
+    def _copy_text(self, text):
+        """Put text on the clipboard through Tk, which already owns the selection"""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+        self.root.update()
+
     def copy_to_clipboard(self):
         if hasattr(self, 'all_prompt_texts') and self.all_prompt_texts:
             try:
-                all_text = '\n\n'.join(self.all_prompt_texts)
-                pyperclip.copy(all_text)
+                if self._joined_prompts is None:
+                    self._joined_prompts = '\n\n'.join(self.all_prompt_texts)
+                self._copy_text(self._joined_prompts)
                 self.status_var.set(f"✓ All {len(self.all_prompt_texts)} prompts copied to clipboard!")
                 self.root.after(3000, lambda: self.status_var.set("Ready"))
             except Exception as e:
@@ -791,7 +1069,7 @@ class ComfyUIPromptExtractorUI:
     def copy_first_prompt(self):
         if hasattr(self, 'all_prompt_texts') and self.all_prompt_texts:
             try:
-                pyperclip.copy(self.all_prompt_texts[0])
+                self._copy_text(self.all_prompt_texts[0])
                 self.status_var.set("✓ First prompt copied to clipboard!")
                 self.root.after(3000, lambda: self.status_var.set("Ready"))
             except Exception as e:
@@ -815,17 +1093,20 @@ class ComfyUIPromptExtractorUI:
 
             if file_path:
                 try:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write("Positive Prompts\n")
-                        f.write("=" * 30 + "\n\n")
-
-                        for i, prompt_text in enumerate(self.all_prompt_texts, 1):
-                            if len(self.all_prompt_texts) > 1:
-                                f.write(f"Prompt {i}:\n")
-                                f.write("-" * 20 + "\n")
-                            f.write(f"{prompt_text}\n")
-                            if i < len(self.all_prompt_texts):
-                                f.write("\n")
+                    # Assemble the file in memory and hand it to the file object in one write
+                    buf = io.StringIO()
+                    buf.write(f"Positive Prompts\n{_BAR30}\n\n")
+
+                    texts = self.all_prompt_texts
+                    if len(texts) > 1:
+                        for i, prompt_text in enumerate(texts[:-1], 1):
+                            buf.write(f"Prompt {i}:\n{_BAR20}\n{prompt_text}\n\n")
+                        buf.write(f"Prompt {len(texts)}:\n{_BAR20}\n{texts[-1]}\n")
+                    else:
+                        buf.write(f"{texts[0]}\n")
+
+                    with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                        f.write(buf.getvalue())
 
                     self.status_var.set(f"✓ Prompts saved to {os.path.basename(file_path)}")
                     self.root.after(3000, lambda: self.status_var.set("Ready"))
@@ -834,6 +1115,7 @@ class ComfyUIPromptExtractorUI:
                     messagebox.showerror("Error", f"Failed to save file:\n{e}")
 
     def clear_results(self):
+        self._cancel_render()
         self.prompt_text.delete(1.0, tk.END)
         self.summary_text.delete(1.0, tk.END)
         self.file_path_var.set("No file selected")
@@ -845,6 +1127,7 @@ class ComfyUIPromptExtractorUI:
         self.current_results = []
         self.current_files = []
         self.all_prompt_texts = []
+        self._joined_prompts = None
         # Hide thumbnail when clearing
         self.hide_thumbnail()
 
@@ -853,11 +1136,6 @@ def main():
     # Check if required packages are available
     missing_packages = []
 
-    try:
-        import pyperclip  # noqa
-    except ImportError:
-        missing_packages.append('pyperclip')
-
     try:
         from PIL import Image  # noqa
     except ImportError:
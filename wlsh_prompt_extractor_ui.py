@@ -1,11 +1,17 @@
 import json
+import mmap
 import os
+import re
+import struct
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from PIL import Image, ImageTk
 import pyperclip
 from typing import Optional
 import threading
+import queue
+from collections import OrderedDict
+import zlib
 
 # Try to import tkinterdnd2 for drag and drop
 try:
@@ -14,6 +20,97 @@ try:
 except ImportError:
     HAS_DND = False
 
+# Use orjson for the parameters JSON when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+_CHUNK_HEADER = struct.Struct('>I4s')
+
+# Key names used for the positive prompt in JSON parameters, in priority order
+POSITIVE_KEYS = (
+    'Positive prompt',
+    'positive prompt',
+    'Positive Prompt',
+    'positive_prompt',
+    'prompt',
+    'Prompt'
+)
+
+# Leading JSON whitespace followed by an object
+_JSON_OBJECT_RE = re.compile(r'[ \t\n\r]*\{')
+
+# "Positive prompt:" line of the parameters text, and the first later line that
+# ends the prompt block (it has a ':' and names another parameter)
+_POSITIVE_LINE_RE = re.compile(r'^[^\S\n]*positive prompt:(.*)$', re.I | re.M)
+_PARAM_LINE_RE = re.compile(
+    r'^(?=[^\n]*:)[^\n]*?(?:negative prompt|steps|sampler|cfg scale|seed|size|model|clip skip)',
+    re.I | re.M
+)
+
+# Number of extracted prompts kept, keyed on (path, mtime, size)
+META_CACHE_SIZE = 256
+
+def _read_png_text_chunks(file_path: str):
+    """Return the PNG text chunks as {keyword: text}, or None if the signature does not match"""
+    text_chunks = {}
+    
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 8
+            end = len(mm)
+            while offset + 8 <= end:
+                length, ctype = _CHUNK_HEADER.unpack_from(mm, offset)
+                data_start = offset + 8
+                offset = data_start + length + 4  # Skip data + CRC
+                
+                if ctype in (b'IDAT', b'IEND'):
+                    break
+                
+                if ctype not in (b'tEXt', b'zTXt', b'iTXt'):
+                    continue
+                
+                if data_start + length > end:
+                    break  # Truncated file
+                data = mm[data_start:data_start + length]
+                
+                try:
+                    if ctype == b'tEXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        text_chunks[keyword.decode('latin-1')] = value.decode('latin-1')
+                    elif ctype == b'zTXt':
+                        keyword, _, value = data.partition(b'\x00')
+                        # value[0] is the compression method (always zlib)
+                        text_chunks[keyword.decode('latin-1')] = zlib.decompress(value[1:]).decode('latin-1')
+                    else:
+                        keyword, _, rest = data.partition(b'\x00')
+                        compressed = rest[0]
+                        # Skip compression method, then language tag and translated keyword
+                        _language, _, rest = rest[2:].partition(b'\x00')
+                        _translated, _, value = rest.partition(b'\x00')
+                        if compressed:
+                            value = zlib.decompress(value)
+                        text_chunks[keyword.decode('latin-1')] = value.decode('utf-8')
+                except (IndexError, zlib.error, UnicodeDecodeError) as e:
+                    print(f"Warning: Skipping malformed {ctype.decode('latin-1')} chunk: {e}")
+    
+    return text_chunks
+
+def _is_png(file_path: str) -> bool:
+    """Check the 8-byte PNG signature, so misnamed or non-image files are rejected cheaply"""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(8) == PNG_SIGNATURE
+    except OSError:
+        return False
+
 class PromptExtractorUI:
     def __init__(self, root):
         self.root = root
@@ -21,12 +118,26 @@ class PromptExtractorUI:
         self.root.geometry("800x600")
         self.root.configure(bg='#f0f0f0')
         
+        # LRU of extracted prompts keyed on (abspath, mtime_ns, size), so dropping
+        # the same unchanged PNG again skips reading it (only the worker touches it)
+        self._meta_cache = OrderedDict()
+        
+        # Prompt and source path currently shown; None until a file is loaded
+        self.current_prompt = None
+        self.current_file_path = None
+        
         # Configure style
         style = ttk.Style()
         style.theme_use('clam')
         
         self.setup_ui()
         
+        # One long-lived worker thread takes file paths from a queue, so repeated
+        # drops don't spawn a thread each
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._run_worker, daemon=True)
+        self._worker.start()
+        
     def setup_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -94,7 +205,8 @@ class PromptExtractorUI:
         
         # Text area for prompt
         self.prompt_text = scrolledtext.ScrolledText(results_frame, wrap=tk.WORD, 
-                                                    height=15, font=('Arial', 10))
+                                                    height=15, font=('Arial', 10),
+                                                    state='disabled', undo=False)
         self.prompt_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         
         # Buttons frame
@@ -126,10 +238,9 @@ class PromptExtractorUI:
         self.clear_btn = ttk.Button(btn_frame, text="Clear", command=self.clear_results)
         self.clear_btn.grid(row=0, column=2)
         
-        # Progress bar (hidden by default)
+        # Progress bar (stays in the layout; only animated while working)
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 5))
-        self.progress.grid_remove()  # Hide initially
     
     def on_drop(self, event):
         """Handle file drop event"""
@@ -172,10 +283,13 @@ class PromptExtractorUI:
             messagebox.showwarning("Warning", "Please select a PNG file")
             return
         
+        if not _is_png(file_path):
+            messagebox.showwarning("Warning", f"Not a valid PNG file: {os.path.basename(file_path)}")
+            return
+        
         # Update UI
         self.file_path_var.set(os.path.basename(file_path))
         self.status_var.set("Processing...")
-        self.progress.grid()
         self.progress.start()
         
         # Disable buttons during processing
@@ -183,15 +297,28 @@ class PromptExtractorUI:
         self.copy_btn.configure(state='disabled')
         self.save_btn.configure(state='disabled')
         
-        # Process file in separate thread to avoid UI freezing
-        thread = threading.Thread(target=self.extract_prompt_thread, args=(file_path,))
-        thread.daemon = True
-        thread.start()
+        # Process file on the worker thread to avoid UI freezing
+        self._jobs.put(file_path)
+    
+    def _run_worker(self):
+        """Process queued file paths, one at a time, for the lifetime of the app"""
+        while True:
+            self.extract_prompt_thread(self._jobs.get())
     
     def extract_prompt_thread(self, file_path):
-        """Extract prompt in separate thread"""
+        """Extract prompt on the worker thread"""
         try:
-            prompt = self.extract_positive_prompt(file_path)
+            stat = os.stat(file_path)
+            key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+            if key in self._meta_cache:
+                self._meta_cache.move_to_end(key)
+                prompt = self._meta_cache[key]
+            else:
+                prompt = self.extract_positive_prompt(file_path)
+                self._meta_cache[key] = prompt
+                if len(self._meta_cache) > META_CACHE_SIZE:
+                    self._meta_cache.popitem(last=False)
+            
             # Update UI in main thread
             self.root.after(0, self.update_results, prompt, file_path)
         except Exception as e:
@@ -199,103 +326,87 @@ class PromptExtractorUI:
     
     def extract_positive_prompt(self, file_path: str) -> Optional[str]:
         """Extract the Positive Prompt from PNG metadata parameters key"""
-        try:
+        metadata = _read_png_text_chunks(file_path)
+        if metadata is None:
+            # Not a PNG stream; let PIL identify it for the error message
             with Image.open(file_path) as img:
-                if img.format != 'PNG':
-                    raise ValueError(f"File is not a PNG: {img.format}")
-                
-                metadata = img.info
-                
-                # Look specifically for parameters key
-                if 'parameters' not in metadata:
-                    return None
-                
-                parameters_data = metadata['parameters']
-                
-                # Try to parse as JSON first
-                try:
-                    parsed_params = json.loads(parameters_data)
-                    
-                    # If it's a dictionary, look for positive prompt keys
-                    if isinstance(parsed_params, dict):
-                        possible_keys = [
-                            'Positive prompt',
-                            'positive prompt', 
-                            'Positive Prompt',
-                            'positive_prompt',
-                            'prompt',
-                            'Prompt'
-                        ]
-                        
-                        for key in possible_keys:
-                            if key in parsed_params:
-                                return parsed_params[key]
-                    
-                except json.JSONDecodeError:
-                    pass
+                fmt = img.format
+            raise ValueError(f"File is not a PNG: {fmt}")
+        
+        # Look specifically for parameters key
+        if 'parameters' not in metadata:
+            return None
+        
+        parameters_data = metadata['parameters']
+        
+        # Try to parse as JSON first; only an object can hold the prompt keys, so
+        # text-format parameters skip the parse and its exception entirely
+        if _JSON_OBJECT_RE.match(parameters_data):
+            try:
+                parsed_params = _loads(parameters_data)
                 
-                # Parse as text format
-                lines = parameters_data.split('\n')
+                # If it's a dictionary, look for positive prompt keys
+                if isinstance(parsed_params, dict):
+                    key = next((k for k in POSITIVE_KEYS if k in parsed_params), None)
+                    if key is not None:
+                        return parsed_params[key]
                 
-                for i, line in enumerate(lines):
-                    line_stripped = line.strip()
-                    
-                    if line_stripped.lower().startswith('positive prompt:'):
-                        # Extract the initial prompt text after the colon
-                        prompt_text = line_stripped.split(':', 1)[1].strip()
-                        
-                        # Collect all following lines until we hit another parameter or end
-                        j = i + 1
-                        prompt_lines = [prompt_text] if prompt_text else []
-                        
-                        while j < len(lines):
-                            next_line = lines[j]
-                            next_line_stripped = next_line.strip()
-                            
-                            # Stop if we encounter another parameter (contains colon and looks like a parameter)
-                            if ':' in next_line_stripped and any(param in next_line_stripped.lower() for param in 
-                                ['negative prompt', 'steps', 'sampler', 'cfg scale', 'seed', 'size', 'model', 'clip skip']):
-                                break
-                            
-                            # Add the line (including empty lines to preserve formatting)
-                            prompt_lines.append(next_line.rstrip())
-                            j += 1
-                    
-
-                        # Join all lines and clean up
-                        full_prompt = '\n'.join(prompt_lines)
+            except json.JSONDecodeError:
+                pass
+        
+        # Parse as text format: find the first "Positive prompt:" line
+        match = _POSITIVE_LINE_RE.search(parameters_data)
+        if match:
+            # Extract the initial prompt text after the colon
+            prompt_text = match.group(1).strip()
+            prompt_lines = [prompt_text] if prompt_text else []
+            
+            # Collect all following lines until we hit another parameter or end
+            # (including empty lines to preserve formatting)
+            block_start = match.end() + 1  # Past the newline ending the match
+            if block_start <= len(parameters_data):
+                stop = _PARAM_LINE_RE.search(parameters_data, block_start)
+                if stop is None:
+                    block = parameters_data[block_start:]
+                elif stop.start() > block_start:
+                    block = parameters_data[block_start:stop.start() - 1]
+                else:
+                    block = None  # The very next line is already a parameter
+                if block is not None:
+                    prompt_lines.extend(line.rstrip() for line in block.split('\n'))
+            
+            # Join all lines and clean up
+            full_prompt = '\n'.join(prompt_lines)
 
-                        # 1) Remove trailing empty lines
-                        full_prompt = full_prompt.rstrip()
+            # 1) Remove trailing empty lines
+            full_prompt = full_prompt.rstrip()
 
-                        # 2) Remove leading empty/newline-only lines BUT preserve internal blank lines
-                        # This strips only lines that are entirely whitespace at the very start.
-                        lines_out = full_prompt.splitlines()
-                        k = 0
-                        while k < len(lines_out) and lines_out[k].strip() == '':
-                            k += 1
-                        full_prompt = '\n'.join(lines_out[k:])
+            # 2) Remove leading empty/newline-only lines BUT preserve internal blank lines
+            # This strips only lines that are entirely whitespace at the very start.
+            lines_out = full_prompt.splitlines()
+            k = 0
+            while k < len(lines_out) and lines_out[k].strip() == '':
+                k += 1
+            full_prompt = '\n'.join(lines_out[k:])
 
-                        return full_prompt if full_prompt else None
-                
-                return None
-                
-        except Exception as e:
-            raise Exception(f"Error reading PNG file: {e}")
+            return full_prompt if full_prompt else None
+        
+        return None
     
     def update_results(self, prompt, file_path):
         """Update UI with extraction results"""
         # Stop progress bar
         self.progress.stop()
-        self.progress.grid_remove()
         
         # Re-enable buttons
         self.browse_btn.configure(state='normal')
         
         if prompt:
-            # Display prompt
+            # Display prompt (the text area is read-only outside of updates)
+            self.prompt_text.configure(state='normal')
             self.prompt_text.delete(1.0, tk.END)
             self.prompt_text.insert(1.0, prompt)
+            self.prompt_text.configure(state='disabled')
             
             # Update status
             self.status_var.set(f"✓ Prompt extracted successfully ({len(prompt)} characters)")
@@ -309,9 +420,11 @@ class PromptExtractorUI:
             self.current_file_path = file_path
             
         else:
+            self.prompt_text.configure(state='normal')
             self.prompt_text.delete(1.0, tk.END)
             self.prompt_text.insert(1.0, "No positive prompt found in this PNG file.\n\n"
                                          "Make sure the PNG contains 'parameters' metadata with a 'Positive prompt' field.")
+            self.prompt_text.configure(state='disabled')
             
             self.status_var.set("✗ No positive prompt found")
             self.current_prompt = None
@@ -319,7 +432,6 @@ class PromptExtractorUI:
     def show_error(self, error_message):
         """Show error message"""
         self.progress.stop()
-        self.progress.grid_remove()
         self.browse_btn.configure(state='normal')
         
         self.status_var.set(f"✗ Error: {error_message}")
@@ -327,7 +439,7 @@ class PromptExtractorUI:
     
     def copy_to_clipboard(self):
         """Copy prompt to clipboard"""
-        if hasattr(self, 'current_prompt') and self.current_prompt:
+        if self.current_prompt:
             try:
                 pyperclip.copy(self.current_prompt)
                 self.status_var.set("✓ Prompt copied to clipboard!")
@@ -340,12 +452,12 @@ class PromptExtractorUI:
     
     def save_to_file(self):
         """Save prompt to text file"""
-        if hasattr(self, 'current_prompt') and self.current_prompt:
+        if self.current_prompt:
             # Default filename based on original PNG
             default_name = "positive_prompt.txt"
-            if hasattr(self, 'current_file_path'):
-                base_name = os.path.splitext(os.path.basename(self.current_file_path))[0]
-                default_name = f"{base_name}_positive_prompt.txt"
+            if self.current_file_path:
+                stem, _ = os.path.splitext(os.path.basename(self.current_file_path))
+                default_name = f"{stem}_positive_prompt.txt"
             
             file_path = filedialog.asksaveasfilename(
                 title="Save Positive Prompt",
@@ -359,7 +471,8 @@ class PromptExtractorUI:
                     with open(file_path, 'w', encoding='utf-8') as f:
                         f.write(self.current_prompt)
                     
-                    self.status_var.set(f"✓ Prompt saved to {os.path.basename(file_path)}")
+                    saved_name = os.path.basename(file_path)
+                    self.status_var.set(f"✓ Prompt saved to {saved_name}")
                     
                     # Reset status after 3 seconds
                     self.root.after(3000, lambda: self.status_var.set("Ready"))
@@ -369,14 +482,15 @@ class PromptExtractorUI:
     
     def clear_results(self):
         """Clear all results"""
+        self.prompt_text.configure(state='normal')
         self.prompt_text.delete(1.0, tk.END)
+        self.prompt_text.configure(state='disabled')
         self.file_path_var.set("No file selected")
         status_text = "Ready - Drag & drop or select a PNG file" if HAS_DND else "Ready - Select a PNG file to extract prompt"
         self.status_var.set(status_text)
         self.copy_btn.configure(state='disabled')
         self.save_btn.configure(state='disabled')
-        if hasattr(self, 'current_prompt'):
-            self.current_prompt = None
+        self.current_prompt = None
 
 def main():
     # Check if required packages are available